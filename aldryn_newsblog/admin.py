@@ -189,7 +189,7 @@ class NewsBlogConfigAdmin(
         return (
             'app_title', 'permalink_type', 'non_permalink_handling',
             'template_prefix', 'paginate_by', 'pagination_pages_start',
-            'pagination_pages_visible', 'exclude_featured',
+            'pagination_pages_visible', 'pagination_mode', 'exclude_featured',
             'create_authors', 'search_indexed', 'config.default_published',
         )
 
@@ -1,7 +1,14 @@
 # -*- coding: utf-8 -*-
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AldrynNewsBlog(AppConfig):
     name = 'aldryn_newsblog'
     verbose_name = 'Aldryn News & Blog'
+
+    def ready(self):
+        from .utils.search import install_search_backend
+
+        post_migrate.connect(install_search_backend, sender=self,
+                             dispatch_uid='aldryn_newsblog_search_backend')
@@ -31,6 +31,11 @@ NON_PERMALINK_HANDLING = (
     (404, _('Return 404: Not Found')),
 )
 
+PAGINATION_MODE_CHOICES = (
+    ('offset', _('Page numbers (default)')),
+    ('keyset', _('Next/previous links, constant time on deep pages')),
+)
+
 # TODO override default if support for Django 1.6 will be dropped
 TEMPLATE_PREFIX_CHOICES = getattr(
     settings, 'ALDRYN_NEWSBLOG_TEMPLATE_PREFIXES', [])
@@ -75,6 +80,17 @@ class NewsBlogConfig(TranslatableModel, AppHookConfig):
         help_text=_('When grouping page numbers, this determines how many '
                     'pages are visible on each side of the active page.'),
     )
+    pagination_mode = models.CharField(
+        _('Pagination mode'),
+        max_length=10,
+        blank=False,
+        default='offset',
+        choices=PAGINATION_MODE_CHOICES,
+        help_text=_('With next/previous links, list pages are fetched from '
+                    'where the previous one ended instead of counting all '
+                    'the articles before them. The page numbers are then '
+                    'based on a cached article count.'),
+    )
     exclude_featured = models.PositiveSmallIntegerField(
         _('Excluded featured articles count'),
         blank=True,
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand
+
+from aldryn_newsblog.models import Article
+from aldryn_newsblog.utils.amp import to_amp_html
+
+
+class Command(BaseCommand):
+    help = ('Rebuilds the AMP markup of the article lead-ins, e.g. of the '
+            'translations saved before it was stored.')
+
+    def handle(self, *args, **options):
+        translation_model = Article._parler_meta.root_model
+        translations = translation_model.objects.values_list('pk', 'lead_in')
+        count = 0
+        for pk, lead_in in translations.iterator():
+            translation_model.objects.filter(pk=pk).update(
+                amp_lead_in=to_amp_html(lead_in))
+            count += 1
+        self.stdout.write(
+            'Rebuilt the AMP markup of {0} translations'.format(count))
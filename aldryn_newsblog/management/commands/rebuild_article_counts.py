@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand
+
+from aldryn_categories.models import Category
+from aldryn_people.models import Person
+from taggit.models import Tag
+
+from aldryn_newsblog.cms_appconfig import NewsBlogConfig
+from aldryn_newsblog.models import ArticleCount
+
+
+class Command(BaseCommand):
+    help = ('Rebuilds the article counts of the authors, categories and tags '
+            'plugins from scratch.')
+
+    def handle(self, *args, **options):
+        for app_config in NewsBlogConfig.objects.all():
+            for model in (Person, Category, Tag):
+                ArticleCount.objects.refresh(app_config.pk, model)
+            self.stdout.write('Rebuilt the article counts of {0}'.format(
+                app_config.namespace))
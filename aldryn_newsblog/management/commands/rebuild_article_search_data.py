@@ -1,13 +1,71 @@
 # -*- coding: utf-8 -*-
+import multiprocessing
+import time
+
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Case, CharField, TextField, Value, When
 
 from parler.utils.context import switch_language
 
 from aldryn_newsblog.models import Article
 
 
+def build_search_data(article_ids, languages, incremental):
+    """
+    Returns a list of (translation pk, search_data, search_data_hash) for the
+    translations of the given articles. In incremental mode, translations
+    whose content did not change since they were last indexed are skipped.
+
+    This is a module level function so that it can run in a worker process.
+    """
+    articles = Article.objects.filter(pk__in=article_ids).prefetch_related(
+        'translations', 'tags', 'categories')
+    updates = []
+    for article in articles:
+        for translation in article.translations.all():
+            language = translation.language_code
+            if language not in languages:
+                continue
+            with switch_language(article, language_code=language):
+                search_data_hash = article.get_search_data_hash(language)
+                if (incremental and  # noqa: W504
+                        search_data_hash == translation.search_data_hash):
+                    continue
+                updates.append((
+                    translation.pk,
+                    article.get_search_data(language),
+                    search_data_hash,
+                ))
+    return updates
+
+
+def save_search_data(updates):
+    """
+    Writes the result of build_search_data() with a single UPDATE statement.
+    """
+    if not updates:
+        return
+    translation_model = Article._parler_meta.root_model
+    search_data = Case(
+        *[When(pk=pk, then=Value(data)) for pk, data, _ in updates],
+        output_field=TextField())
+    search_data_hash = Case(
+        *[When(pk=pk, then=Value(data_hash)) for pk, _, data_hash in updates],
+        output_field=CharField())
+    translation_model.objects.filter(
+        pk__in=[pk for pk, _, _ in updates]
+    ).update(search_data=search_data, search_data_hash=search_data_hash)
+
+
+def _build_search_data(args):
+    article_ids = args[0]
+    return len(article_ids), build_search_data(*args)
+
+
 class Command(BaseCommand):
+    help = 'Rebuilds the search_data of the published articles.'
     can_import_settings = True
 
     def add_arguments(self, parser):
@@ -18,6 +76,39 @@ class Command(BaseCommand):
             dest='languages',
             default=None,
         )
+        parser.add_argument(
+            '-i',
+            '--incremental',
+            action='store_true',
+            dest='incremental',
+            default=False,
+            help='Only rebuild the articles whose content changed since they '
+                 'were last indexed.',
+        )
+        parser.add_argument(
+            '--outdated',
+            action='store_true',
+            dest='outdated',
+            default=False,
+            help='Only rebuild the translations marked as outdated when '
+                 'their content plugins were saved, published or not (see '
+                 'aldryn_newsblog.utils.search_data).',
+        )
+        parser.add_argument(
+            '-w',
+            '--workers',
+            type=int,
+            dest='workers',
+            default=1,
+            help='Number of worker processes rendering the articles.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            dest='batch_size',
+            default=100,
+            help='Number of articles rendered and saved at a time.',
+        )
 
     def handle(self, *args, **options):
         languages = options.get('languages')
@@ -25,26 +116,50 @@ class Command(BaseCommand):
         if languages is None:
             languages = [language[0] for language in settings.LANGUAGES]
 
-        # ArticleTranslation
-        translation_model = Article._parler_meta.root_model
-
-        for article in Article.objects.published():
-            translations = article.translations.filter(
-                language_code__in=languages
-            )
-
-            # build internal parler cache
-            parler_cache = dict(
-                (trans.language_code, trans) for trans in translations)
+        incremental = options.get('incremental', False)
+        outdated = options.get('outdated', False)
+        workers = max(options.get('workers') or 1, 1)
+        batch_size = max(options.get('batch_size') or 100, 1)
 
-            # set internal parler cache
-            # to avoid parler hitting db for every language
-            article._translations_cache[translation_model] = parler_cache
+        if outdated:
+            # the outdated translations have an empty search_data_hash,
+            # which the incremental mode never takes as up to date
+            incremental = True
+            articles = Article.objects.filter(
+                translations__search_data_hash='',
+                translations__language_code__in=languages).distinct()
+        else:
+            articles = Article.objects.published()
+        # Consecutive pk ranges, so that each batch is one indexed range read.
+        article_ids = list(articles.order_by('pk').values_list(
+            'pk', flat=True))
+        batches = [
+            (article_ids[start:start + batch_size], languages, incremental)
+            for start in range(0, len(article_ids), batch_size)]
 
-            for translation in translations:
-                language = translation.language_code
+        pool = None
+        if workers > 1 and len(batches) > 1:
+            # The worker processes must not share the parent's connections.
+            connections.close_all()
+            pool = multiprocessing.Pool(workers)
+            results = pool.imap_unordered(_build_search_data, batches)
+        else:
+            results = (_build_search_data(batch) for batch in batches)
 
-                with switch_language(article, language_code=language):
-                    translation.search_data = article.get_search_data()
-                    # make sure to only update the search_data field
-                    translation.save(update_fields=["search_data"])
+        started = time.time()
+        done = updated = 0
+        try:
+            for count, updates in results:
+                save_search_data(updates)
+                done += count
+                updated += len(updates)
+                elapsed = time.time() - started
+                self.stdout.write(
+                    'Processed {0}/{1} articles, {2} translations updated '
+                    '({3:.1f} articles/s)'.format(
+                        done, len(article_ids), updated,
+                        done / elapsed if elapsed else 0))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
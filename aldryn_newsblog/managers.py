@@ -3,21 +3,188 @@
 from __future__ import unicode_literals
 
 import datetime
-from collections import Counter
+import hashlib
+import logging
+import math
+import uuid
+from itertools import chain
 from operator import attrgetter
 
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, OperationalError, models, transaction
+from django.db.models.functions import TruncMonth
+from django.db.models.query import ModelIterable
+from django.utils.encoding import force_bytes
 from django.utils.timezone import now
+from django.utils.translation import get_language
 
 from aldryn_apphooks_config.managers.base import ManagerMixin, QuerySetMixin
+from aldryn_categories.models import Category
 from aldryn_people.models import Person
 from parler.managers import TranslatableManager, TranslatableQuerySet
+from parler.utils.i18n import get_active_language_choices
 from taggit.models import Tag, TaggedItem
 
 from aldryn_newsblog.compat import toolbar_edit_mode_active
 
 
+logger = logging.getLogger(__name__)
+
+
+TAG_INDEX_CACHE_TIMEOUT = getattr(
+    settings, 'ALDRYN_NEWSBLOG_TAG_INDEX_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def get_tag_index_cache_key(tag_name):
+    """
+    Returns the cache key of the tag -> articles index entry for the given tag
+    name. Tags are matched case-insensitively, so the name is lowercased.
+    """
+    digest = hashlib.md5(force_bytes(tag_name.lower())).hexdigest()
+    return 'aldryn_newsblog:tag_index:{0}'.format(digest)
+
+
+def invalidate_tag_index(tag_names):
+    """Drops the tag -> articles index entries of the given tag names."""
+    cache.delete_many([get_tag_index_cache_key(name) for name in tag_names])
+
+
+PUBLICATION_TIMELINE_CACHE_TIMEOUT = getattr(
+    settings, 'ALDRYN_NEWSBLOG_PUBLICATION_TIMELINE_CACHE_TIMEOUT',
+    60 * 60 * 24)
+
+
+def get_publication_timeline_cache_key(app_config_id):
+    return 'aldryn_newsblog:publication_timeline:{0}'.format(app_config_id)
+
+
+def invalidate_publication_timeline(app_config_id):
+    """Drops the cached next publishing date of the given app config."""
+    cache.delete(get_publication_timeline_cache_key(app_config_id))
+
+
+# Version tokens outlive what is cached with them; an expired token is
+# simply replaced, which only makes what depended on it a cache miss.
+VERSION_CACHE_TIMEOUT = getattr(
+    settings, 'ALDRYN_NEWSBLOG_VERSION_CACHE_TIMEOUT', 60 * 60 * 24 * 7)
+
+
+def get_version_cache_key(name):
+    return 'aldryn_newsblog:version:{0}'.format(name)
+
+
+def get_versions(names):
+    """
+    Returns a {name: token} dict of the version tokens of the given names,
+    e.g. 'article:<pk>' or 'articles:<app config pk>'. A token changes
+    whenever update_versions() is called with its name; include the tokens
+    in the cache keys of (or store them with) anything built from what they
+    name.
+    """
+    cache_keys = dict((get_version_cache_key(name), name) for name in names)
+    versions = cache.get_many(list(cache_keys))
+    missing = [key for key in cache_keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, VERSION_CACHE_TIMEOUT)
+        versions.update(cache.get_many(missing))
+    return dict(
+        (cache_keys[key], version) for key, version in versions.items())
+
+
+def update_versions(names):
+    """Changes the version tokens of the given names."""
+    cache.set_many(dict(
+        (get_version_cache_key(name), uuid.uuid4().hex) for name in names),
+        VERSION_CACHE_TIMEOUT)
+
+
+def get_articles_version(app_config_id):
+    """
+    Returns a token that changes whenever an article of the given app config
+    is saved or deleted.
+    """
+    name = 'articles:{0}'.format(app_config_id)
+    return get_versions([name])[name]
+
+
+NAVIGATION_CACHE_TIMEOUT = getattr(
+    settings, 'ALDRYN_NEWSBLOG_NAVIGATION_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+FEATURED_IDS_CACHE_TIMEOUT = getattr(
+    settings, 'ALDRYN_NEWSBLOG_FEATURED_IDS_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_featured_ids_cache_key(app_config_id):
+    return 'aldryn_newsblog:featured_ids:{0}'.format(app_config_id)
+
+
+def invalidate_featured_ids(app_config_id):
+    """Drops the cached featured article pks of the given app config."""
+    cache.delete(get_featured_ids_cache_key(app_config_id))
+
+
+MONTHS_CACHE_TIMEOUT = getattr(
+    settings, 'ALDRYN_NEWSBLOG_MONTHS_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def get_months_cache_key(namespace, edit_mode):
+    return 'aldryn_newsblog:months:{0}:{1}:{2}'.format(
+        getattr(settings, 'SITE_ID', None), namespace, int(edit_mode))
+
+
+def invalidate_months(namespace):
+    """Drops the cached archive months of the given namespace."""
+    cache.delete_many([
+        get_months_cache_key(namespace, edit_mode)
+        for edit_mode in (False, True)])
+
+
+def get_translations_prefetch(lookup, model, languages):
+    """
+    Returns a Prefetch of the translations of `model` (reached through
+    `lookup`) in the given languages and their fallbacks only.
+    """
+    translations = model._parler_meta.root_model.objects.filter(
+        language_code__in=languages)
+    return models.Prefetch(lookup, queryset=translations)
+
+
 class ArticleQuerySet(QuerySetMixin, TranslatableQuerySet):
+    def __init__(self, *args, **kwargs):
+        super(ArticleQuerySet, self).__init__(*args, **kwargs)
+        self._prefetch_urls = False
+        self._prefetch_urls_language = None
+
+    def _clone(self, *args, **kwargs):
+        clone = super(ArticleQuerySet, self)._clone(*args, **kwargs)
+        clone._prefetch_urls = self._prefetch_urls
+        clone._prefetch_urls_language = self._prefetch_urls_language
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super(ArticleQuerySet, self)._fetch_all()
+        if (not fetched and self._prefetch_urls and
+                self._iterable_class is ModelIterable):
+            self.model.prefetch_urls(
+                self._result_cache, self._prefetch_urls_language)
+
+    def with_urls(self, language=None):
+        """
+        Fetches the cached urls of the articles with a single cache query
+        once the queryset is evaluated, see Article.prefetch_urls(). The
+        urls are in the given language (by default the one active then).
+        """
+        clone = self._clone()
+        clone._prefetch_urls = True
+        clone._prefetch_urls_language = language
+        return clone
+
     def published(self):
         """
         Returns articles that are published AND have a publishing_date that
@@ -25,6 +192,53 @@ class ArticleQuerySet(QuerySetMixin, TranslatableQuerySet):
         """
         return self.filter(is_published=True, publishing_date__lte=now())
 
+    def get_neighbour_ids(self, article):
+        """
+        Returns the pks of the articles of this queryset published right
+        before and right after the given one (or None), in a single query.
+        Articles published at the same time are ordered by their pk.
+        """
+        publishing_date, pk = article.publishing_date, article.pk
+        previous = self.filter(
+            models.Q(publishing_date__lt=publishing_date) |  # noqa: W504
+            models.Q(publishing_date=publishing_date, pk__lt=pk),
+        ).order_by('-publishing_date', '-pk').values('pk')[:1]
+        following = self.filter(
+            models.Q(publishing_date__gt=publishing_date) |  # noqa: W504
+            models.Q(publishing_date=publishing_date, pk__gt=pk),
+        ).order_by('publishing_date', 'pk').values('pk')[:1]
+        neighbour_ids = self.model._default_manager.filter(pk=pk).annotate(
+            previous_id=models.Subquery(previous),
+            next_id=models.Subquery(following),
+        ).values_list('previous_id', 'next_id').first()
+        return neighbour_ids or (None, None)
+
+    def with_listing_prefetch(self, languages=None):
+        """
+        Fetches everything the article lists and plugins render of each
+        article in a fixed number of queries, however many articles there
+        are: its translations, app config, featured image, author and
+        categories (with their translations), tags and url.
+
+        Only the translations in the given languages (by default the active
+        one) and their fallbacks are fetched; parler does not query for the
+        others once the translations were prefetched.
+        """
+        if not languages:
+            languages = [get_language()]
+        languages = set(chain.from_iterable(
+            get_active_language_choices(language) for language in languages))
+        return self.select_related(
+            'app_config', 'featured_image', 'author',
+        ).prefetch_related(
+            get_translations_prefetch('translations', self.model, languages),
+            get_translations_prefetch(
+                'author__translations', Person, languages),
+            get_translations_prefetch(
+                'categories__translations', Category, languages),
+            'tags',
+        ).with_urls()
+
 
 class RelatedManager(ManagerMixin, TranslatableManager):
     def get_queryset(self):
@@ -34,6 +248,97 @@ class RelatedManager(ManagerMixin, TranslatableManager):
     def published(self):
         return self.get_queryset().published()
 
+    def get_tagged_article_ids(self, tag_name):
+        """
+        Returns the pks of all articles tagged with `tag_name` (compared
+        case-insensitively), most recently published first.
+
+        The result is an inverted tag -> articles index entry, kept in the
+        cache and invalidated by the TaggedItem and Article signal handlers in
+        aldryn_newsblog.models.
+        """
+        cache_key = get_tag_index_cache_key(tag_name)
+        article_ids = cache.get(cache_key)
+        if article_ids is None:
+            article_ids = list(self.get_queryset()
+                               .filter(tags__name__iexact=tag_name)
+                               .order_by('-publishing_date')
+                               .values_list('pk', flat=True)
+                               .distinct())
+            cache.set(cache_key, article_ids, TAG_INDEX_CACHE_TIMEOUT)
+        return article_ids
+
+    def get_related_by_tag(self, tag_name, exclude=None, limit=None):
+        """
+        Returns a queryset of (at most `limit`) articles tagged with
+        `tag_name`, most recently published first, leaving out the `exclude`
+        article.
+
+        Only the primary keys of the resulting page are queried, so the cost of
+        this does not depend on how many articles there are.
+        """
+        exclude_pk = getattr(exclude, 'pk', exclude)
+        article_ids = [
+            pk for pk in self.get_tagged_article_ids(tag_name)
+            if pk != exclude_pk]
+        if limit is not None:
+            article_ids = article_ids[:limit]
+        return self.get_queryset().filter(
+            pk__in=article_ids).order_by('-publishing_date')
+
+    def get_published_valid_until(self, app_config_id):
+        """
+        Returns until when the published articles of the given app config
+        stay the same unless an article is saved: the publishing date of the
+        next scheduled article, or None if there is none. Anything built from
+        published() can be cached until then.
+        """
+        cache_key = get_publication_timeline_cache_key(app_config_id)
+        cached = cache.get(cache_key)
+        if cached is not None and (cached[0] is None or cached[0] > now()):
+            return cached[0]
+        valid_until = self.get_queryset().filter(
+            app_config_id=app_config_id,
+            is_published=True,
+            publishing_date__gt=now(),
+        ).aggregate(next=models.Min('publishing_date'))['next']
+        # wrapped in a tuple, so that None is cached as well
+        cache.set(
+            cache_key, (valid_until, ), PUBLICATION_TIMELINE_CACHE_TIMEOUT)
+        return valid_until
+
+    def get_published_cache_timeout(self, app_config_id, timeout):
+        """
+        Returns the given cache timeout, cut short so that the cache expires
+        when the next scheduled article of the app config goes live.
+        """
+        valid_until = self.get_published_valid_until(app_config_id)
+        if valid_until is None:
+            return timeout
+        seconds = int(math.ceil((valid_until - now()).total_seconds()))
+        if timeout is None:
+            return max(seconds, 1)
+        return max(min(seconds, timeout), 1)
+
+    def get_featured_ids(self, app_config_id, count, published=True):
+        """
+        Returns the pks of the `count` latest featured articles of the given
+        app config, only the published ones unless `published` is False.
+        """
+        cache_key = get_featured_ids_cache_key(app_config_id)
+        featured_ids = cache.get(cache_key) or {}
+        try:
+            return featured_ids[(count, published)]
+        except KeyError:
+            pass
+        queryset = self.published() if published else self.get_queryset()
+        featured_ids[(count, published)] = list(queryset.filter(
+            app_config_id=app_config_id, is_featured=True,
+        ).order_by('-publishing_date').values_list('pk', flat=True)[:count])
+        cache.set(cache_key, featured_ids, self.get_published_cache_timeout(
+            app_config_id, FEATURED_IDS_CACHE_TIMEOUT))
+        return featured_ids[(count, published)]
+
     def get_months(self, request, namespace):
         """
         Get months and years with articles count for given request and namespace
@@ -53,25 +358,39 @@ class RelatedManager(ManagerMixin, TranslatableManager):
         ]
         """
 
-        # TODO: check if this limitation still exists in Django 1.6+
-        # This is done in a naive way as Django is having tough time while
-        # aggregating on date fields
-        if (request and hasattr(request, 'toolbar') and  # noqa: #W504
-                request.toolbar and toolbar_edit_mode_active(request)):
+        edit_mode = bool(
+            request and hasattr(request, 'toolbar') and  # noqa: #W504
+            request.toolbar and toolbar_edit_mode_active(request))
+        cache_key = get_months_cache_key(namespace, edit_mode)
+        months = cache.get(cache_key)
+        if months is not None:
+            return months
+
+        if edit_mode:
             articles = self.namespace(namespace)
         else:
             articles = self.published().namespace(namespace)
-        dates = articles.values_list('publishing_date', flat=True)
-        dates = [(x.year, x.month) for x in dates]
-        date_counter = Counter(dates)
-        dates = set(dates)
-        dates = sorted(dates, reverse=True)
+        rows = articles.annotate(
+            month=TruncMonth('publishing_date'),
+        ).values('month').annotate(
+            num_articles=models.Count('pk'),
+        ).order_by('-month')
         months = [
             # Use day=3 to make sure timezone won't affect this hacks'
             # month value. There are UTC+14 and UTC-12 timezones!
-            {'date': datetime.date(year=year, month=month, day=3),
-             'num_articles': date_counter[(year, month)]}
-            for year, month in dates]
+            {'date': datetime.date(
+                year=row['month'].year, month=row['month'].month, day=3),
+             'num_articles': row['num_articles']}
+            for row in rows if row['month'] is not None]
+
+        timeout = MONTHS_CACHE_TIMEOUT
+        if not edit_mode:
+            app_config_id = self.namespace(namespace).values_list(
+                'app_config_id', flat=True).first()
+            if app_config_id is not None:
+                timeout = self.get_published_cache_timeout(
+                    app_config_id, timeout)
+        cache.set(cache_key, months, timeout)
         return months
 
     def get_authors(self, namespace):
@@ -116,3 +435,134 @@ class RelatedManager(ManagerMixin, TranslatableManager):
         for tag in tags:
             tag.num_articles = counted_tags[tag.pk]
         return sorted(tags, key=attrgetter('num_articles'), reverse=True)
+
+
+def get_article_counts_lock_key(app_config_id, model):
+    return 'aldryn_newsblog:article_counts_lock:{0}:{1}'.format(
+        app_config_id, model._meta.label_lower)
+
+
+# How long a request may hold the right to refresh outdated article counts.
+ARTICLE_COUNTS_LOCK_TIMEOUT = 60
+
+
+class ArticleCountManager(models.Manager):
+
+    def count_articles(self, app_config_id, model, object_ids=None, at=None):
+        """
+        Returns {pk: (published_count, total_count)} of the given objects of
+        `model` (of all of them if object_ids is None) having articles in the
+        given app config, counted from the articles as they are published
+        `at` (now by default). It only reads.
+        """
+        Article = apps.get_model('aldryn_newsblog', 'Article')
+        lookup = '{0}__pk'.format(
+            self.model.COUNTED_RELATIONS[model._meta.label_lower])
+        articles = Article.objects.filter(app_config_id=app_config_id)
+        if object_ids is not None:
+            articles = articles.filter(**{lookup + '__in': object_ids})
+        published = models.Case(
+            models.When(is_published=True,
+                        publishing_date__lte=at or now(),
+                        then=models.Value(1)),
+            default=models.Value(0),
+            output_field=models.IntegerField())
+        rows = articles.order_by().values(lookup).annotate(
+            total_count=models.Count('pk'),
+            published_count=models.Sum(published))
+        return dict(
+            (row[lookup], (row['published_count'], row['total_count']))
+            for row in rows if row[lookup] is not None)
+
+    def refresh(self, app_config_id, model, object_ids=None):
+        """
+        Recomputes the article counts of the given objects of `model` (of all
+        of them if object_ids is None) in the given app config. Returns them
+        as count_articles() does.
+        """
+        if object_ids is not None:
+            object_ids = set(object_ids) - {None}
+            if not object_ids:
+                return {}
+        Article = apps.get_model('aldryn_newsblog', 'Article')
+        content_type = ContentType.objects.get_for_model(model)
+        refreshed = now()
+        valid_until = Article.objects.get_published_valid_until(app_config_id)
+        article_counts = self.count_articles(
+            app_config_id, model, object_ids, at=refreshed)
+
+        counts = self.filter(
+            app_config_id=app_config_id, content_type=content_type)
+        if object_ids is not None:
+            counts = counts.filter(object_id__in=object_ids)
+        with transaction.atomic(using=self.db):
+            counts.delete()
+            self.bulk_create([
+                self.model(
+                    app_config_id=app_config_id,
+                    content_type=content_type,
+                    object_id=object_id,
+                    published_count=published_count,
+                    total_count=total_count,
+                    refreshed=refreshed,
+                    valid_until=valid_until)
+                for object_id, (published_count, total_count)
+                in article_counts.items()])
+        return article_counts
+
+    def refresh_outdated(self, app_config_id, model):
+        """
+        Returns {pk: published_count} of the objects of `model` counted from
+        the articles, for when their stored counts are outdated.
+
+        Only one request at a time also stores them, the others (and those
+        whose refresh failed, e.g. on a lock wait or a concurrent insert)
+        serve the counts they read. Run the rebuild_article_counts command on
+        a schedule to keep these refreshes off the requests.
+        """
+        article_counts = None
+        lock_key = get_article_counts_lock_key(app_config_id, model)
+        if cache.add(lock_key, True, ARTICLE_COUNTS_LOCK_TIMEOUT):
+            try:
+                article_counts = self.refresh(app_config_id, model)
+            except (IntegrityError, OperationalError):
+                logger.warning(
+                    'Could not refresh the article counts of %s in app '
+                    'config %s.', model._meta.label_lower, app_config_id,
+                    exc_info=True)
+            finally:
+                cache.delete(lock_key)
+        if article_counts is None:
+            article_counts = self.count_articles(app_config_id, model)
+        return dict(
+            (object_id, published_count)
+            for object_id, (published_count, _) in article_counts.items())
+
+    def get_counted_objects(self, app_config, model, edit_mode=False):
+        """
+        Returns a list of the objects of `model` that have articles in the
+        given app config, annotated by the number of articles (article_count)
+        and ordered by it. Outside of edit mode, only published articles are
+        counted.
+        """
+        content_type = ContentType.objects.get_for_model(model)
+        rows = list(self.filter(
+            app_config=app_config, content_type=content_type,
+        ).values_list(
+            'object_id', 'published_count', 'total_count', 'valid_until'))
+
+        article_counts = dict(
+            (object_id, total_count if edit_mode else published_count)
+            for object_id, published_count, total_count, _ in rows)
+        if not edit_mode:
+            # Articles scheduled for later get published without being
+            # saved, the counts are outdated once one of them went live.
+            valid_until = [row[3] for row in rows if row[3] is not None]
+            if valid_until and min(valid_until) <= now():
+                article_counts = self.refresh_outdated(app_config.pk, model)
+        objects = list(model._default_manager.filter(pk__in=[
+            object_id for object_id, count in article_counts.items()
+            if count]))
+        for obj in objects:
+            obj.article_count = article_counts[obj.pk]
+        return sorted(objects, key=attrgetter('article_count'), reverse=True)
@@ -2,17 +2,23 @@
 
 from __future__ import unicode_literals
 
+import hashlib
+
 import django.core.validators
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
-from django.db import connection, models
-from django.db.models.signals import post_save
+from django.db import models
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete, pre_save,
+)
 from django.dispatch import receiver
-from django.urls import reverse
-from django.utils.encoding import force_text, python_2_unicode_compatible
+from django.utils.encoding import (
+    force_bytes, force_text, python_2_unicode_compatible,
+)
 from django.utils.timezone import now
-from django.utils.translation import override, ugettext
+from django.utils.translation import ugettext
 from django.utils.translation import ugettext_lazy as _
 
 from cms.models.fields import PlaceholderField
@@ -31,17 +37,24 @@ from filer.fields.image import FilerImageField
 from parler.models import TranslatableModel, TranslatedFields
 from sortedm2m.fields import SortedManyToManyField
 from taggit.managers import TaggableManager
-from taggit.models import Tag
+from taggit.models import Tag, TaggedItem
 
 from aldryn_newsblog.compat import toolbar_edit_mode_active
-from aldryn_newsblog.utils.utilities import get_valid_languages_from_request
+from aldryn_newsblog.utils.utilities import (
+    get_valid_languages_from_request, reverse_article_url,
+)
 
 from .cms_appconfig import NewsBlogConfig
-from .managers import RelatedManager
+from .managers import (
+    ArticleCountManager, RelatedManager, invalidate_featured_ids,
+    invalidate_months, invalidate_publication_timeline, invalidate_tag_index,
+    update_versions,
+)
 from .utils import get_plugin_index_data, get_request, strip_tags
+from .utils.amp import to_amp_html
+from .utils.search_data import schedule_search_data_update
 
-from cms.models.pagemodel import Page
-from page_setting.models import Page_Tag
+from page_setting.utils import get_page_tag
 
 if settings.LANGUAGES:
     LANGUAGE_CODES = [language[0] for language in settings.LANGUAGES]
@@ -52,17 +65,24 @@ else:
         'Neither LANGUAGES nor LANGUAGE was found in settings.')
 
 
-# At startup time, SQL_NOW_FUNC will contain the database-appropriate SQL to
-# obtain the CURRENT_TIMESTAMP.
-SQL_NOW_FUNC = {
-    'mssql': 'GetDate()', 'mysql': 'NOW()', 'postgresql': 'now()',
-    'sqlite': 'CURRENT_TIMESTAMP', 'oracle': 'CURRENT_TIMESTAMP'
-}[connection.vendor]
+ARTICLE_URL_CACHE_TIMEOUT = getattr(
+    settings, 'ALDRYN_NEWSBLOG_ARTICLE_URL_CACHE_TIMEOUT', 60 * 60 * 24)
+
 
-SQL_IS_TRUE = {
-    'mssql': '== TRUE', 'mysql': '= 1', 'postgresql': 'IS TRUE',
-    'sqlite': '== 1', 'oracle': 'IS TRUE'
-}[connection.vendor]
+def get_article_url_cache_key(article_pk, language, app_config_id):
+    return 'aldryn_newsblog:article_url:{0}:{1}:{2}'.format(
+        article_pk, language, app_config_id)
+
+
+def invalidate_article_urls(articles):
+    """
+    Drops the cached url kwargs of the given (article pk, app config pk)
+    pairs, in all languages.
+    """
+    cache.delete_many([
+        get_article_url_cache_key(article_pk, language, app_config_id)
+        for article_pk, app_config_id in articles
+        for language in LANGUAGE_CODES])
 
 
 @python_2_unicode_compatible
@@ -112,6 +132,15 @@ class Article(TranslatedAutoSlugifyMixin,
         meta={'unique_together': (('language_code', 'slug', ), )},
 
         search_data=models.TextField(blank=True, editable=False),
+        # fingerprint of the content search_data was last built from, see
+        # Article.get_search_data_hash(); empty when search_data is outdated
+        search_data_hash=models.CharField(
+            max_length=40, blank=True, default='', editable=False,
+            db_index=True),
+
+        # lead_in as AMP markup, see aldryn_newsblog.utils.amp; NULL for
+        # translations saved before it was stored
+        amp_lead_in=models.TextField(null=True, blank=True, editable=False),
 
         additional_info=models.CharField(
             max_length=255, verbose_name=_('additional info'),
@@ -188,6 +217,7 @@ class Article(TranslatedAutoSlugifyMixin,
 
     class Meta:
         ordering = ['-publishing_date']
+        index_together = [('app_config', 'publishing_date', 'id')]
 
     @property
     def published(self):
@@ -205,10 +235,11 @@ class Article(TranslatedAutoSlugifyMixin,
         """
         return self.is_published and self.publishing_date > now()
 
-    def get_absolute_url(self, language=None):
-        """Returns the url for this Article in the selected permalink format."""
-        if not language:
-            language = get_current_language()
+    def get_url_kwargs(self, language):
+        """
+        Returns the namespace, kwargs and language the article-detail url of
+        this Article is reversed with, for the selected permalink format.
+        """
         kwargs = {}
         permalink_type = self.app_config.permalink_type
         if 'y' in permalink_type:
@@ -232,9 +263,56 @@ class Article(TranslatedAutoSlugifyMixin,
             namespace = '{0}:'.format(self.app_config.namespace)
         else:
             namespace = ''
+        return namespace, kwargs, language
+
+    def get_absolute_url(self, language=None):
+        """
+        Returns the url for this Article in the selected permalink format.
+        The url kwargs are cached per article, language and app config, the
+        url is then built without touching the app config or translations.
+        """
+        if not language:
+            language = get_current_language()
+        if not self.pk:
+            return reverse_article_url(*self.get_url_kwargs(language))
+        url_kwargs = getattr(self, '_url_kwargs', {}).get(language)
+        if url_kwargs is None:
+            cache_key = get_article_url_cache_key(
+                self.pk, language, self.app_config_id)
+            url_kwargs = cache.get(cache_key)
+        if url_kwargs is None:
+            url_kwargs = self.get_url_kwargs(language)
+            cache.set(cache_key, url_kwargs, ARTICLE_URL_CACHE_TIMEOUT)
+        return reverse_article_url(*url_kwargs)
+
+    @classmethod
+    def prefetch_urls(cls, articles, language=None):
+        """
+        Fetches the cached url kwargs of the given articles with a single
+        cache query (and caches the missing ones with another), so that
+        get_absolute_url() does not query the cache once per article of a
+        list. See ArticleQuerySet.with_urls().
+        """
+        if not language:
+            language = get_current_language()
+        articles = [article for article in articles if article.pk]
+        cache_keys = [
+            get_article_url_cache_key(
+                article.pk, language, article.app_config_id)
+            for article in articles]
+        cached = cache.get_many(cache_keys)
+        missing = {}
+        for cache_key, article in zip(cache_keys, articles):
+            url_kwargs = cached.get(cache_key)
+            if url_kwargs is None:
+                url_kwargs = missing[cache_key] = article.get_url_kwargs(
+                    language)
+            if not hasattr(article, '_url_kwargs'):
+                article._url_kwargs = {}
+            article._url_kwargs[language] = url_kwargs
+        if missing:
+            cache.set_many(missing, ARTICLE_URL_CACHE_TIMEOUT)
 
-        with override(language):
-            return reverse('{0}article-detail'.format(namespace), kwargs=kwargs)
     def get_article_tags(self, language=None):
         if not self.pk:
             return ''
@@ -242,6 +320,18 @@ class Article(TranslatedAutoSlugifyMixin,
         if language is None:
             language = get_current_language()
         return [tag.name.lower() for tag in self.tags.all()]
+
+    def get_amp_lead_in(self):
+        """
+        Returns the lead-in as AMP markup, as stored when the translation was
+        last saved, or converted now for translations saved before that.
+        """
+        amp_lead_in = self.safe_translation_getter('amp_lead_in')
+        if amp_lead_in is None:
+            amp_lead_in = to_amp_html(
+                self.safe_translation_getter('lead_in', ''))
+        return amp_lead_in
+
     def get_search_data(self, language=None, request=None):
         """
         Provides an index for use with Haystack, or, for populating
@@ -268,6 +358,29 @@ class Article(TranslatedAutoSlugifyMixin,
                 text_bits.append(plugin_text_content)
         return ' '.join(text_bits)
 
+    def get_search_data_hash(self, language=None):
+        """
+        Returns a fingerprint of everything get_search_data() is built from,
+        without rendering any plugin. Content plugins are represented by
+        their pk and last change date.
+        """
+        if not self.pk:
+            return ''
+        if language is None:
+            language = get_current_language()
+        bits = [self.safe_translation_getter(
+            'lead_in', '', language_code=language)]
+        for category in self.categories.all():
+            bits.append(force_text(category.safe_translation_getter('name')))
+        for tag in self.tags.all():
+            bits.append(force_text(tag.name))
+        if self.content_id:
+            plugins = self.content.cmsplugin_set.filter(
+                language=language).order_by('pk')
+            for pk, changed_date in plugins.values_list('pk', 'changed_date'):
+                bits.append('{0}:{1}'.format(pk, changed_date.isoformat()))
+        return hashlib.sha1(force_bytes('\n'.join(bits))).hexdigest()
+
     def save(self, *args, **kwargs):
         # Update the search index
         if self.update_search_on_save:
@@ -365,38 +478,14 @@ class NewsBlogArticleSearchPlugin(NewsBlogCMSPlugin):
 class NewsBlogAuthorsPlugin(PluginEditModeMixin, NewsBlogCMSPlugin):
     def get_authors(self, request):
         """
-        Returns a queryset of authors (people who have published an article),
+        Returns a list of authors (people who have published an article),
         annotated by the number of articles (article_count) that are visible to
         the current user. If this user is anonymous, then this will be all
         articles that are published and whose publishing_date has passed. If the
         user is a logged-in cms operator, then it will be all articles.
         """
-
-        # The basic subquery (for logged-in content managers in edit mode)
-        subquery = """
-            SELECT COUNT(*)
-            FROM aldryn_newsblog_article
-            WHERE
-                aldryn_newsblog_article.author_id =
-                    aldryn_people_person.id AND
-                aldryn_newsblog_article.app_config_id = %d"""
-
-        # For other users, limit subquery to published articles
-        if not self.get_edit_mode(request):
-            subquery += """ AND
-                aldryn_newsblog_article.is_published %s AND
-                aldryn_newsblog_article.publishing_date <= %s
-            """ % (SQL_IS_TRUE, SQL_NOW_FUNC, )
-
-        # Now, use this subquery in the construction of the main query.
-        query = """
-            SELECT (%s) as article_count, aldryn_people_person.*
-            FROM aldryn_people_person
-        """ % (subquery % (self.app_config.pk, ), )
-
-        raw_authors = list(Person.objects.raw(query))
-        authors = [author for author in raw_authors if author.article_count]
-        return sorted(authors, key=lambda x: x.article_count, reverse=True)
+        return ArticleCount.objects.get_counted_objects(
+            self.app_config, Person, self.get_edit_mode(request))
 
     def __str__(self):
         return ugettext('%s authors') % (self.app_config.get_app_title(), )
@@ -415,33 +504,8 @@ class NewsBlogCategoriesPlugin(PluginEditModeMixin, NewsBlogCMSPlugin):
         publishing_date has passed. If the user is a logged-in cms operator,
         then it will be all articles.
         """
-
-        subquery = """
-            SELECT COUNT(*)
-            FROM aldryn_newsblog_article, aldryn_newsblog_article_categories
-            WHERE
-                aldryn_newsblog_article_categories.category_id =
-                    aldryn_categories_category.id AND
-                aldryn_newsblog_article_categories.article_id =
-                    aldryn_newsblog_article.id AND
-                aldryn_newsblog_article.app_config_id = %d
-        """ % (self.app_config.pk, )
-
-        if not self.get_edit_mode(request):
-            subquery += """ AND
-                aldryn_newsblog_article.is_published %s AND
-                aldryn_newsblog_article.publishing_date <= %s
-            """ % (SQL_IS_TRUE, SQL_NOW_FUNC, )
-
-        query = """
-            SELECT (%s) as article_count, aldryn_categories_category.*
-            FROM aldryn_categories_category
-        """ % (subquery, )
-
-        raw_categories = list(Category.objects.raw(query))
-        categories = [
-            category for category in raw_categories if category.article_count]
-        return sorted(categories, key=lambda x: x.article_count, reverse=True)
+        return ArticleCount.objects.get_counted_objects(
+            self.app_config, Category, self.get_edit_mode(request))
 
 
 @python_2_unicode_compatible
@@ -464,7 +528,7 @@ class NewsBlogFeaturedArticlesPlugin(PluginEditModeMixin, NewsBlogCMSPlugin):
             return queryset.none()
         queryset = queryset.translated(*languages).filter(
             app_config=self.app_config,
-            is_featured=True)
+            is_featured=True).with_listing_prefetch(languages)
         return queryset[:self.article_count]
 
     def __str__(self):
@@ -518,14 +582,10 @@ class NewsBlogLatestArticlesPlugin(PluginEditModeMixin,
         # exclude_featured = featured_qs.values_list(
         #     'pk', flat=True)[:self.exclude_featured]
         # queryset = queryset.exclude(pk__in=list(exclude_featured))
-        try:
-            current_node_id = request.current_page.node_id
-            page_ids = Page.objects.filter(node_id=current_node_id).filter(publisher_is_draft=1).values('id')
-            page_tag = Page_Tag.objects.get(page_id=page_ids[0]['id']).page_tag
-        except:
-            return queryset[:self.latest_articles]
-        result = [x for x in queryset if page_tag.lower() in x.get_article_tags()]
-        return result[:self.latest_articles]
+        page_tag = get_page_tag(request)
+        if page_tag is not None:
+            queryset = queryset.filter(tags__name__iexact=page_tag).distinct()
+        return queryset.with_listing_prefetch()[:self.latest_articles]
 
     def __str__(self):
         return ugettext('%(app_title)s latest articles: %(latest_articles)s') % {
@@ -556,7 +616,7 @@ class NewsBlogRelatedPlugin(PluginEditModeMixin, AdjustableCacheModelMixin,
         qs = article.related.translated(*languages)
         if not self.get_edit_mode(request):
             qs = qs.published()
-        return qs
+        return qs.with_listing_prefetch(languages)
 
     def __str__(self):
         return ugettext('Related articles')
@@ -567,58 +627,347 @@ class NewsBlogTagsPlugin(PluginEditModeMixin, NewsBlogCMSPlugin):
 
     def get_tags(self, request):
         """
-        Returns a queryset of tags, annotated by the number of articles
+        Returns a list of tags, annotated by the number of articles
         (article_count) that are visible to the current user. If this user is
         anonymous, then this will be all articles that are published and whose
         publishing_date has passed. If the user is a logged-in cms operator,
         then it will be all articles.
         """
+        return ArticleCount.objects.get_counted_objects(
+            self.app_config, Tag, self.get_edit_mode(request))
 
-        article_content_type = ContentType.objects.get_for_model(Article)
+    def __str__(self):
+        return ugettext('%s tags') % (self.app_config.get_app_title(), )
 
-        subquery = """
-            SELECT COUNT(*)
-            FROM aldryn_newsblog_article, taggit_taggeditem
-            WHERE
-                taggit_taggeditem.tag_id = taggit_tag.id AND
-                taggit_taggeditem.content_type_id = %d AND
-                taggit_taggeditem.object_id = aldryn_newsblog_article.id AND
-                aldryn_newsblog_article.app_config_id = %d"""
 
-        if not self.get_edit_mode(request):
-            subquery += """ AND
-                aldryn_newsblog_article.is_published %s AND
-                aldryn_newsblog_article.publishing_date <= %s
-            """ % (SQL_IS_TRUE, SQL_NOW_FUNC, )
+class ArticleCount(models.Model):
+    """
+    The number of articles of an author, category or tag in an app config,
+    maintained by the signal handlers below for the authors, categories and
+    tags plugins. Use the rebuild_article_counts command to recompute all of
+    them.
+    """
+    # The Article relations of the counted models.
+    COUNTED_RELATIONS = {
+        'aldryn_people.person': 'author',
+        'aldryn_categories.category': 'categories',
+        'taggit.tag': 'tags',
+    }
 
-        query = """
-            SELECT (%s) as article_count, taggit_tag.*
-            FROM taggit_tag
-        """ % (subquery % (article_content_type.id, self.app_config.pk), )
+    app_config = models.ForeignKey(
+        NewsBlogConfig,
+        on_delete=models.CASCADE,
+    )
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+    )
+    object_id = models.PositiveIntegerField()
+    published_count = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    refreshed = models.DateTimeField(default=now)
+    # When the published_count may change without a signal, see
+    # RelatedManager.get_published_valid_until().
+    valid_until = models.DateTimeField(null=True, blank=True)
 
-        raw_tags = list(Tag.objects.raw(query))
-        tags = [tag for tag in raw_tags if tag.article_count]
-        return sorted(tags, key=lambda x: x.article_count, reverse=True)
+    objects = ArticleCountManager()
 
-    def __str__(self):
-        return ugettext('%s tags') % (self.app_config.get_app_title(), )
+    class Meta:
+        unique_together = (('app_config', 'content_type', 'object_id'), )
+
+
+def get_plugin_article_pk(plugin):
+    """
+    Returns the pk of the article whose content the given plugin is part of,
+    or None.
+    """
+    placeholder = (getattr(plugin, '_placeholder_cache', None) or  # noqa: W504
+                   plugin.placeholder)
+    if getattr(placeholder, '_attached_model_cache', None) != Article:
+        return None
+    return Article.objects.filter(
+        content=placeholder.pk).values_list('pk', flat=True).first()
 
 
 @receiver(post_save, dispatch_uid='article_update_search_data')
 def update_search_data(sender, instance, **kwargs):
     """
     Upon detecting changes in a plugin used in an Article's content
-    (PlaceholderField), update the article's search_index so that we can
-    perform simple searches even without Haystack, etc.
+    (PlaceholderField), schedule an update of the article's search_index so
+    that we can perform simple searches even without Haystack, etc.
+    The update runs once per article and language after the transaction
+    commits, see aldryn_newsblog.utils.search_data.
     """
     is_cms_plugin = issubclass(instance.__class__, CMSPlugin)
 
     if Article.update_search_on_save and is_cms_plugin:
-        placeholder = (getattr(instance, '_placeholder_cache', None) or  # noqa: W504
-                       instance.placeholder)
-        if hasattr(placeholder, '_attached_model_cache'):
-            if placeholder._attached_model_cache == Article:
-                article = placeholder._attached_model_cache.objects.language(
-                    instance.language).get(content=placeholder.pk)
-                article.search_data = article.get_search_data(instance.language)
-                article.save()
+        article_pk = get_plugin_article_pk(instance)
+        if article_pk is not None:
+            schedule_search_data_update(article_pk, instance.language)
+
+
+@receiver(post_save, sender=TaggedItem,
+          dispatch_uid='article_tag_index_tagged_item_save')
+@receiver(post_delete, sender=TaggedItem,
+          dispatch_uid='article_tag_index_tagged_item_delete')
+def update_tag_index_for_tagged_item(sender, instance, **kwargs):
+    """
+    Invalidates the tag -> articles index entry of a tag whenever an article
+    gets tagged or untagged with it.
+    """
+    article_content_type = ContentType.objects.get_for_model(Article)
+    if instance.content_type_id != article_content_type.pk:
+        return
+    try:
+        tag_name = instance.tag.name
+    except Tag.DoesNotExist:
+        return
+    invalidate_tag_index([tag_name])
+
+
+@receiver(pre_save, sender=Tag, dispatch_uid='article_tag_index_tag_pre_save')
+def remember_tag_name_before_save(sender, instance, **kwargs):
+    # the index entries are keyed by name, a renamed tag has two of them
+    if instance.pk is not None:
+        instance._tag_index_name = Tag.objects.filter(
+            pk=instance.pk).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=Tag, dispatch_uid='article_tag_index_tag_save')
+@receiver(post_delete, sender=Tag,
+          dispatch_uid='article_tag_index_tag_delete')
+def update_tag_index_for_tag(sender, instance, **kwargs):
+    tag_names = [instance.name]
+    previous_name = getattr(instance, '_tag_index_name', None)
+    if previous_name is not None and previous_name != instance.name:
+        tag_names.append(previous_name)
+    invalidate_tag_index(tag_names)
+
+
+@receiver(post_save, sender=Article,
+          dispatch_uid='article_tag_index_article_save')
+@receiver(pre_delete, sender=Article,
+          dispatch_uid='article_tag_index_article_delete')
+def update_tag_index_for_article(sender, instance, **kwargs):
+    """
+    The tag -> articles index is ordered by publishing date, so the entries of
+    all the article's tags are dropped when it is saved or deleted.
+    """
+    invalidate_tag_index(instance.tags.names())
+
+
+@receiver(post_save, sender=Article,
+          dispatch_uid='article_months_article_save')
+@receiver(post_delete, sender=Article,
+          dispatch_uid='article_months_article_delete')
+def update_publication_caches_for_article(sender, instance, **kwargs):
+    """
+    Publishing, unpublishing, (re)dating or deleting an article changes the
+    archive months, featured articles and article navigation of its
+    namespace and may change when its next scheduled article goes live. The
+    latter must be dropped before the article counts are refreshed below.
+    An article moved to another app config changes both namespaces.
+    """
+    app_config_ids = {instance.app_config_id}
+    previous = getattr(instance, '_counted_before_save', None)
+    if previous is not None and previous[1] != instance.app_config_id:
+        app_config_ids.add(previous[1])
+        invalidate_months(NewsBlogConfig.objects.filter(
+            pk=previous[1]).values_list('namespace', flat=True).first())
+    invalidate_months(instance.app_config.namespace)
+    for app_config_id in app_config_ids:
+        invalidate_publication_timeline(app_config_id)
+        invalidate_featured_ids(app_config_id)
+    update_versions(
+        ['articles:{0}'.format(pk) for pk in app_config_ids] +  # noqa: W504
+        ['article:{0}'.format(instance.pk)])
+
+
+@receiver(post_save, sender=Article,
+          dispatch_uid='article_url_article_save')
+@receiver(post_delete, sender=Article,
+          dispatch_uid='article_url_article_delete')
+def update_article_url_for_article(sender, instance, **kwargs):
+    instance.__dict__.pop('_url_kwargs', None)
+    invalidate_article_urls([(instance.pk, instance.app_config_id)])
+
+
+@receiver(post_save, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_url_translation_save')
+@receiver(post_delete, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_url_translation_delete')
+def update_article_url_for_translation(sender, instance, **kwargs):
+    # The article itself may be deleted along with its translations, in
+    # which case update_article_url_for_article invalidates its urls.
+    app_config_ids = Article.objects.filter(
+        pk=instance.master_id).values_list('app_config_id', flat=True)
+    invalidate_article_urls([
+        (instance.master_id, app_config_id)
+        for app_config_id in app_config_ids])
+
+
+@receiver(pre_save, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_amp_lead_in_translation_save')
+def update_amp_lead_in(sender, instance, **kwargs):
+    instance.amp_lead_in = to_amp_html(instance.lead_in)
+
+
+@receiver(post_save, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_version_translation_save')
+def update_article_version_for_translation(sender, instance, **kwargs):
+    """
+    The version tokens name what cached responses were rendered from, see
+    aldryn_newsblog.utils.response_cache.
+    """
+    update_versions(['article:{0}'.format(instance.master_id)])
+
+
+@receiver(post_save, dispatch_uid='article_version_plugin_save')
+@receiver(post_delete, dispatch_uid='article_version_plugin_delete')
+def update_article_version_for_plugin(sender, instance, **kwargs):
+    if not isinstance(instance, CMSPlugin):
+        return
+    article_pk = get_plugin_article_pk(instance)
+    if article_pk is not None:
+        update_versions(['article:{0}'.format(article_pk)])
+
+
+@receiver(post_save, sender=TaggedItem,
+          dispatch_uid='article_version_tagged_item_save')
+@receiver(post_delete, sender=TaggedItem,
+          dispatch_uid='article_version_tagged_item_delete')
+def update_article_version_for_tagged_item(sender, instance, **kwargs):
+    article_content_type = ContentType.objects.get_for_model(Article)
+    if instance.content_type_id == article_content_type.pk:
+        update_versions([
+            'article:{0}'.format(instance.object_id),
+            'tag:{0}'.format(instance.tag_id),
+        ])
+
+
+@receiver(post_save, sender=Tag, dispatch_uid='article_version_tag_save')
+@receiver(post_delete, sender=Tag, dispatch_uid='article_version_tag_delete')
+def update_tag_version(sender, instance, **kwargs):
+    update_versions(['tag:{0}'.format(instance.pk)])
+
+
+@receiver(m2m_changed, sender=Article.related.through,
+          dispatch_uid='article_version_related_changed')
+def update_article_version_for_related(sender, instance, action, reverse,
+                                       pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    # in reverse, the related articles of the pk_set articles changed
+    article_ids = (pk_set or ()) if reverse else [instance.pk]
+    update_versions(['article:{0}'.format(pk) for pk in article_ids])
+
+
+@receiver(post_save, sender=NewsBlogConfig,
+          dispatch_uid='article_url_app_config_save')
+def update_article_url_for_app_config(sender, instance, **kwargs):
+    """
+    The namespace and permalink type are part of the cached url kwargs of all
+    the articles of an app config.
+    """
+    article_ids = Article.objects.filter(
+        app_config=instance).values_list('pk', flat=True)
+    invalidate_article_urls(
+        [(article_id, instance.pk) for article_id in article_ids])
+
+
+def get_counted_ids(article):
+    """
+    Returns the pks of the author, categories and tags of the article, by
+    counted model.
+    """
+    return {
+        Person: {article.author_id},
+        Category: set(article.categories.values_list('pk', flat=True)),
+        Tag: set(article.tags.values_list('pk', flat=True)),
+    }
+
+
+@receiver(pre_save, sender=Article,
+          dispatch_uid='article_counts_article_pre_save')
+def remember_counted_ids_before_save(sender, instance, **kwargs):
+    """
+    Keeps the previous author and app config of the article, so that their
+    counts (and the caches of the previous app config) are refreshed as well
+    when they change.
+    """
+    instance._counted_before_save = Article.objects.filter(
+        pk=instance.pk).values_list('author_id', 'app_config_id').first()
+
+
+@receiver(pre_delete, sender=Article,
+          dispatch_uid='article_counts_article_pre_delete')
+def remember_counted_ids_before_delete(sender, instance, **kwargs):
+    # The categories and tags are gone by the time post_delete is sent.
+    instance._counted_before_delete = get_counted_ids(instance)
+
+
+@receiver(post_save, sender=Article,
+          dispatch_uid='article_counts_article_save')
+def update_article_counts_for_article(sender, instance, **kwargs):
+    counted_ids = get_counted_ids(instance)
+    app_config_ids = {instance.app_config_id}
+    previous = getattr(instance, '_counted_before_save', None)
+    if previous is not None:
+        counted_ids[Person].add(previous[0])
+        app_config_ids.add(previous[1])
+    for app_config_id in app_config_ids:
+        for model, object_ids in counted_ids.items():
+            ArticleCount.objects.refresh(app_config_id, model, object_ids)
+
+
+@receiver(post_delete, sender=Article,
+          dispatch_uid='article_counts_article_delete')
+def update_article_counts_for_deleted_article(sender, instance, **kwargs):
+    counted_ids = getattr(instance, '_counted_before_delete', {})
+    for model, object_ids in counted_ids.items():
+        ArticleCount.objects.refresh(
+            instance.app_config_id, model, object_ids)
+
+
+@receiver(m2m_changed, sender=Article.categories.through,
+          dispatch_uid='article_counts_categories_changed')
+def update_article_counts_for_categories(sender, instance, action, reverse,
+                                         pk_set, **kwargs):
+    if action == 'pre_clear':
+        # pk_set is None on clear, remember what is about to be removed
+        if reverse:
+            instance._counted_cleared = set(instance.article_set.values_list(
+                'pk', flat=True))
+        else:
+            instance._counted_cleared = set(instance.categories.values_list(
+                'pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_counted_cleared', set())
+    elif action not in ('post_add', 'post_remove'):
+        return
+
+    if reverse:
+        # instance is a Category, pk_set holds article pks
+        app_config_ids = Article.objects.filter(
+            pk__in=pk_set).values_list('app_config_id', flat=True).distinct()
+        for app_config_id in app_config_ids:
+            ArticleCount.objects.refresh(
+                app_config_id, Category, [instance.pk])
+    else:
+        ArticleCount.objects.refresh(
+            instance.app_config_id, Category, pk_set)
+
+
+@receiver(post_save, sender=TaggedItem,
+          dispatch_uid='article_counts_tagged_item_save')
+@receiver(post_delete, sender=TaggedItem,
+          dispatch_uid='article_counts_tagged_item_delete')
+def update_article_counts_for_tagged_item(sender, instance, **kwargs):
+    article_content_type = ContentType.objects.get_for_model(Article)
+    if instance.content_type_id != article_content_type.pk:
+        return
+    app_config_id = Article.objects.filter(
+        pk=instance.object_id).values_list('app_config_id', flat=True).first()
+    if app_config_id is not None:
+        ArticleCount.objects.refresh(app_config_id, Tag, [instance.tag_id])
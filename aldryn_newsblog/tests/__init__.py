@@ -29,6 +29,7 @@ from parler.utils.context import switch_language
 
 from aldryn_newsblog.cms_apps import NewsBlogApp
 from aldryn_newsblog.models import Article, NewsBlogConfig
+from page_setting.utils import clear_page_tag_cache
 
 
 TESTS_ROOT = os.path.abspath(os.path.dirname(__file__))
@@ -184,6 +185,8 @@ class NewsBlogTestsMixin(object):
         return request
 
     def setUp(self):
+        # page node ids are reused across tests, their cached tags are not
+        clear_page_tag_cache()
         self.template = get_cms_setting('TEMPLATES')[0][0]
         self.language = settings.LANGUAGES[0][0]
         self.root_page = api.create_page(
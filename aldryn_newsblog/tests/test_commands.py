@@ -5,7 +5,9 @@ from __future__ import unicode_literals
 from django.core.management import call_command
 from django.utils.translation import activate
 
-from aldryn_newsblog.models import Article
+from aldryn_people.models import Person
+
+from aldryn_newsblog.models import Article, ArticleCount
 
 from . import NewsBlogTestCase
 
@@ -34,3 +36,42 @@ class TestCommands(NewsBlogTestCase):
         call_command('rebuild_article_search_data', languages=[self.language])
         # now verify the article's search_data has been updated.
         self.assertEqual(article.search_data, search_data)
+
+    def test_rebuild_search_data_command_incremental(self):
+        activate(self.language)
+        article = self.create_article()
+        translations = article.translations.filter(
+            language_code=self.language)
+        call_command('rebuild_article_search_data', languages=[self.language])
+        search_data = translations.get().search_data
+
+        # the content did not change, so an incremental run skips the article
+        translations.update(search_data='')
+        call_command('rebuild_article_search_data', languages=[self.language],
+                     incremental=True)
+        self.assertEqual(translations.get().search_data, '')
+
+        # a content change is picked up
+        article.tags.add('tag1')
+        call_command('rebuild_article_search_data', languages=[self.language],
+                     incremental=True)
+        self.assertEqual(translations.get().search_data, search_data + ' tag1')
+
+    def test_rebuild_article_counts_command(self):
+        author = self.create_person()
+        for _ in range(2):
+            self.create_article(author=author)
+        self.create_article(author=author, is_published=False)
+        ArticleCount.objects.all().delete()
+        self.assertEqual(ArticleCount.objects.get_counted_objects(
+            self.app_config, Person), [])
+
+        call_command('rebuild_article_counts')
+        authors = ArticleCount.objects.get_counted_objects(
+            self.app_config, Person)
+        self.assertEqual(
+            [(person.pk, person.article_count) for person in authors],
+            [(author.pk, 2)])
+        authors = ArticleCount.objects.get_counted_objects(
+            self.app_config, Person, edit_mode=True)
+        self.assertEqual(authors[0].article_count, 3)
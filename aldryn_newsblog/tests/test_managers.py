@@ -2,7 +2,17 @@
 
 from __future__ import unicode_literals
 
-from aldryn_newsblog.models import Article
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from aldryn_people.models import Person
+from taggit.models import Tag
+
+from aldryn_newsblog.managers import get_article_counts_lock_key
+from aldryn_newsblog.models import Article, ArticleCount
 
 from . import NewsBlogTestCase
 
@@ -24,3 +34,92 @@ class TestManagers(NewsBlogTestCase):
         article_url = article.get_absolute_url()
         response = self.client.get(article_url)
         self.assertEqual(response.status_code, 404)
+
+    def test_related_by_tag(self):
+        articles = self.create_tagged_articles(4, tags=['Tag1'])['tag1']
+        self.create_tagged_articles(2, tags=['tag2'])
+        main_article = articles[0]
+
+        related = Article.objects.get_related_by_tag(
+            'tag1', exclude=main_article, limit=2)
+        self.assertEqual(list(related), [articles[3], articles[2]])
+
+        # once the index is warm, a page of related articles is one query
+        with self.assertNumQueries(1):
+            list(Article.objects.get_related_by_tag(
+                'TAG1', exclude=main_article, limit=2))
+
+    def test_related_by_tag_index_invalidation(self):
+        articles = self.create_tagged_articles(2, tags=['tag1'])['tag1']
+        self.assertEqual(
+            list(Article.objects.get_related_by_tag('tag1')),
+            [articles[1], articles[0]])
+
+        new_article = self.create_article()
+        new_article.tags.add('tag1')
+        articles[1].tags.remove('tag1')
+        self.assertEqual(
+            list(Article.objects.get_related_by_tag('tag1')),
+            [new_article, articles[0]])
+
+    def test_related_by_tag_index_tag_rename(self):
+        articles = self.create_tagged_articles(2, tags=['tag1'])['tag1']
+        self.assertEqual(list(Article.objects.get_related_by_tag('tag2')), [])
+        self.assertEqual(
+            len(Article.objects.get_related_by_tag('tag1')), 2)
+
+        tag = Tag.objects.get(name='tag1')
+        tag.name = 'tag2'
+        tag.save()
+        self.assertEqual(list(Article.objects.get_related_by_tag('tag1')), [])
+        self.assertEqual(
+            list(Article.objects.get_related_by_tag('tag2')),
+            [articles[1], articles[0]])
+
+    def test_published_valid_until(self):
+        app_config_id = self.app_config.pk
+        self.create_article()
+        self.assertIsNone(
+            Article.objects.get_published_valid_until(app_config_id))
+        self.assertEqual(
+            Article.objects.get_published_cache_timeout(app_config_id, 300),
+            300)
+
+        scheduled = self.create_article(
+            publishing_date=now() + timedelta(seconds=60))
+        self.create_article(publishing_date=now() + timedelta(days=1))
+        self.assertEqual(
+            Article.objects.get_published_valid_until(app_config_id),
+            scheduled.publishing_date)
+        self.assertLessEqual(
+            Article.objects.get_published_cache_timeout(app_config_id, 300),
+            60)
+
+    def test_outdated_article_counts(self):
+        author = self.create_person()
+        self.create_article(author=author)
+        scheduled = self.create_article(
+            author=author, publishing_date=now() + timedelta(seconds=60))
+        # the scheduled article goes live without being saved
+        Article.objects.filter(pk=scheduled.pk).update(
+            publishing_date=now() - timedelta(seconds=1))
+        ArticleCount.objects.update(
+            valid_until=now() - timedelta(seconds=1))
+        stored_count = ArticleCount.objects.filter(
+            content_type=ContentType.objects.get_for_model(Person),
+            object_id=author.pk).values_list('published_count', flat=True)
+        self.assertEqual(stored_count.get(), 1)
+
+        # while another request refreshes them, the counts are only read
+        lock_key = get_article_counts_lock_key(self.app_config.pk, Person)
+        cache.add(lock_key, True)
+        authors = ArticleCount.objects.get_counted_objects(
+            self.app_config, Person)
+        self.assertEqual(authors[0].article_count, 2)
+        self.assertEqual(stored_count.get(), 1)
+
+        cache.delete(lock_key)
+        authors = ArticleCount.objects.get_counted_objects(
+            self.app_config, Person)
+        self.assertEqual(authors[0].article_count, 2)
+        self.assertEqual(stored_count.get(), 2)
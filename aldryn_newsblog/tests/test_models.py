@@ -5,12 +5,17 @@ from __future__ import unicode_literals
 import os
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
 from django.utils.timezone import now
 from django.utils.translation import activate, override
 
 from cms import api
 
-from aldryn_newsblog.models import Article
+from aldryn_newsblog.models import Article, get_article_url_cache_key
+from aldryn_newsblog.utils.search_data import get_scheduled_updates
 
 from . import TESTS_STATIC_ROOT, NewsBlogTestCase, NewsBlogTransactionTestCase
 
@@ -154,6 +159,88 @@ class TestModels(NewsBlogTestCase):
         self.assertEquals(lead_in, search_data)
         self.assertNotEquals(article.search_data, search_data)
 
+    def test_absolute_url_is_cached(self):
+        article = self.create_article()
+        url = article.get_absolute_url(self.language)
+        article = Article.objects.get(pk=article.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(article.get_absolute_url(self.language), url)
+
+        article.set_current_language(self.language)
+        article.slug = self.rand_str()
+        article.save()
+        article = Article.objects.get(pk=article.pk)
+        self.assertNotEqual(article.get_absolute_url(self.language), url)
+
+    def test_absolute_url_dropped_on_translation_delete(self):
+        article = self.create_article()
+        article.set_current_language('de')
+        article.title = self.rand_str()
+        article.slug = self.rand_str()
+        article.save()
+        url = article.get_absolute_url('de')
+
+        article.translations.filter(language_code='de').delete()
+        article = Article.objects.get(pk=article.pk)
+        self.assertNotEqual(article.get_absolute_url('de'), url)
+
+    def test_listed_urls_are_fetched_at_once(self):
+        articles = [self.create_article() for _ in range(3)]
+        urls = [article.get_absolute_url(self.language)
+                for article in articles]
+        cache_keys = [
+            get_article_url_cache_key(
+                article.pk, self.language, article.app_config_id)
+            for article in articles]
+        cache.delete(cache_keys[0])
+
+        listed = list(Article.objects.filter(
+            pk__in=[article.pk for article in articles],
+        ).order_by('pk').with_listing_prefetch().with_urls(self.language))
+        # the missing url was cached along the way
+        self.assertIsNotNone(cache.get(cache_keys[0]))
+        # and the urls are built without touching the cache
+        cache.delete_many(cache_keys)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [article.get_absolute_url(self.language)
+                 for article in listed], urls)
+        self.assertEqual(cache.get_many(cache_keys), {})
+
+    def test_amp_lead_in_is_stored_on_save(self):
+        article = self.create_article(
+            lead_in='<p>lead <img src="a.png"> in</p><script>x()</script>')
+        translation = article.translations.get(language_code=self.language)
+        self.assertEqual(translation.amp_lead_in, '<p>lead  in</p>')
+        self.assertEqual(article.get_amp_lead_in(), '<p>lead  in</p>')
+
+    def test_amp_lead_in_of_older_translations(self):
+        # images without a size are dropped, nothing is left
+        article = self.create_article(lead_in='<img src="a.png">')
+        translations = Article._parler_meta.root_model.objects.filter(
+            master=article)
+        translations.update(lead_in='<p>changed</p>')
+        article = Article.objects.language(self.language).get(pk=article.pk)
+        self.assertEqual(article.get_amp_lead_in(), '')
+
+        # translations saved before the AMP markup was stored
+        translations.update(amp_lead_in=None)
+        article = Article.objects.language(self.language).get(pk=article.pk)
+        self.assertEqual(article.get_amp_lead_in(), '<p>changed</p>')
+
+    def test_plugin_saves_schedule_one_search_data_update(self):
+        activate(self.language)
+        Article.update_search_on_save = True
+        article = self.create_article()
+        # the test case runs in a transaction which never commits
+        for _ in range(3):
+            api.add_plugin(article.content, 'TextPlugin', self.language,
+                           body=self.rand_str())
+        self.assertEqual(get_scheduled_updates(),
+                         set([(article.pk, self.language)]))
+        callbacks = [func for sids, func in connection.run_on_commit]
+        self.assertEqual(len(callbacks), 1)
+
     def test_has_content(self):
         # Just make sure we have a known language
         activate(self.language)
@@ -242,3 +329,31 @@ class TestModelsTransactions(NewsBlogTransactionTestCase):
                                 article_lang,
                                 original_lang,
                             ))
+
+    def test_plugin_save_updates_search_data(self):
+        activate(self.language)
+        Article.update_search_on_save = True
+        article = self.create_article()
+        content = self.rand_str()
+        api.add_plugin(article.content, 'TextPlugin', self.language,
+                       body=content)
+        translation = article.translations.get(language_code=self.language)
+        # only marked as outdated, for the scheduled command to rebuild it
+        self.assertEqual(translation.search_data_hash, '')
+        self.assertNotIn(content, translation.search_data)
+        call_command('rebuild_article_search_data', outdated=True)
+        article = Article.objects.language(self.language).get(pk=article.pk)
+        self.assertIn(content, article.search_data)
+        self.assertEqual(article.search_data_hash,
+                         article.get_search_data_hash(self.language))
+
+    @override_settings(ALDRYN_NEWSBLOG_SEARCH_DATA_WORKER='sync')
+    def test_plugin_save_updates_search_data_sync(self):
+        activate(self.language)
+        Article.update_search_on_save = True
+        article = self.create_article()
+        content = self.rand_str()
+        api.add_plugin(article.content, 'TextPlugin', self.language,
+                       body=content)
+        article = Article.objects.language(self.language).get(pk=article.pk)
+        self.assertIn(content, article.search_data)
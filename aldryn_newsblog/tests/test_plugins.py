@@ -16,6 +16,7 @@ from cms.models import StaticPlaceholder
 import pytz
 
 from aldryn_newsblog.models import NewsBlogConfig
+from page_setting.models import Page_Tag
 
 from . import NewsBlogTestCase
 
@@ -316,6 +317,45 @@ class TestLatestArticlesPlugin(TestPluginLanguageHelperMixin,
         article = self.create_article()
         self._test_plugin_languages_with_article(article)
 
+    def test_latest_articles_plugin_page_tag_num_queries(self):
+        Page_Tag.objects.create(page=self.plugin_page, page_tag='Tag1')
+        request = self.get_request(self.language)
+        request.current_page = self.plugin_page
+        self.create_tagged_articles(2, tags=['tag1'], is_featured=True)
+        # page tag, articles and their tags
+        with self.assertNumQueries(3):
+            articles = list(self.plugin.get_articles(request))
+        self.assertEqual(len(articles), 2)
+
+        # the page tag is cached now and the query count must not depend on
+        # the number of articles
+        self.create_tagged_articles(10, tags=['tag1'], is_featured=True)
+        self.create_tagged_articles(10, tags=['tag2'], is_featured=True)
+        request = self.get_request(self.language)
+        request.current_page = self.plugin_page
+        with self.assertNumQueries(2):
+            articles = list(self.plugin.get_articles(request))
+        self.assertEqual(len(articles), self.plugin.latest_articles)
+
+    def test_latest_articles_plugin_page_tag_invalidation(self):
+        page_tag = Page_Tag.objects.create(
+            page=self.plugin_page, page_tag='tag1')
+        tag1_article = self.create_tagged_articles(
+            1, tags=['tag1'], is_featured=True)['tag1'][0]
+        tag2_article = self.create_tagged_articles(
+            1, tags=['tag2'], is_featured=True)['tag2'][0]
+        request = self.get_request(self.language)
+        request.current_page = self.plugin_page
+        self.assertEqual(list(self.plugin.get_articles(request)),
+                         [tag1_article])
+
+        page_tag.page_tag = 'tag2'
+        page_tag.save()
+        request = self.get_request(self.language)
+        request.current_page = self.plugin_page
+        self.assertEqual(list(self.plugin.get_articles(request)),
+                         [tag2_article])
+
 
 class TestPrefixedLatestArticlesPlugin(TestAppConfigPluginsBase):
     plugin_to_test = 'NewsBlogLatestArticlesPlugin'
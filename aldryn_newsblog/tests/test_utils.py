@@ -4,9 +4,18 @@ from __future__ import unicode_literals
 
 from unittest import TestCase
 
-from django.urls import NoReverseMatch, reverse
+from django.urls import NoReverseMatch, clear_url_caches, reverse
+from django.utils.translation import override
 
-from ..utils import add_prefix_to_path, default_reverse
+from ..utils import add_prefix_to_path, default_reverse, strip_tags
+from ..utils.amp import to_amp_html
+from ..utils.search import (
+    get_query_terms, is_boolean_query, quote_hyphenated_words,
+)
+from ..utils.utilities import (
+    get_resolver_cache, get_valid_languages, reverse_article_url,
+)
+from . import NewsBlogTestCase
 
 
 class TestAddPrefixToPath(TestCase):
@@ -72,3 +81,105 @@ class TestAddPrefixToPath(TestCase):
             except:  # noqa: E722
                 self.fail('default_reverse raised exception even though we '
                           'set a default value of: {0}.'.format(default))
+
+
+class TestGetQueryTerms(TestCase):
+
+    def test_terms(self):
+        self.assertEqual(
+            get_query_terms('<b>data</b>  "connected car" \'tv\''),
+            ['data', 'connected car', 'tv'])
+
+    def test_empty(self):
+        self.assertEqual(get_query_terms(''), [])
+
+
+class TestBooleanQueries(TestCase):
+
+    def test_is_boolean_query(self):
+        self.assertTrue(is_boolean_query('data -tv'))
+        self.assertTrue(is_boolean_query('+data'))
+        self.assertTrue(is_boolean_query('"connected car"'))
+        self.assertTrue(is_boolean_query('connect*'))
+        self.assertFalse(is_boolean_query('real-time data'))
+        self.assertFalse(is_boolean_query(''))
+
+    def test_quote_hyphenated_words(self):
+        self.assertEqual(
+            quote_hyphenated_words('+real-time -tv "co-op car"'),
+            '+"real-time" -tv "co-op car"')
+
+
+class TestStripTags(TestCase):
+
+    def test_strip_tags(self):
+        self.assertEqual(
+            strip_tags('<p>Some <strong>bold</strong> text</p>'),
+            'Some bold text')
+
+    def test_drops_scripts_styles_and_comments(self):
+        self.assertEqual(
+            strip_tags('<style>p {}</style><p>one</p><script>var a = 1;'
+                       '</script> two<!-- comment --> three'),
+            'one two three')
+
+    def test_empty_values(self):
+        self.assertEqual(strip_tags(''), '')
+        self.assertEqual(strip_tags('  \n'), '')
+        self.assertEqual(strip_tags(None), None)
+
+
+class TestAmpHtml(TestCase):
+
+    def test_images_become_amp_images(self):
+        self.assertEqual(
+            to_amp_html('<p><img src="a.png" width="10" height="5" alt="a" '
+                        'onload="x()"> text</p>'),
+            '<p><amp-img src="a.png" alt="a" width="10" height="5" '
+            'layout="responsive"></amp-img> text</p>')
+
+    def test_images_without_size_are_dropped(self):
+        self.assertEqual(
+            to_amp_html('<p>one <img src="a.png"> two</p>'),
+            '<p>one  two</p>')
+
+    def test_drops_disallowed_markup(self):
+        self.assertEqual(
+            to_amp_html('<p style="color: red" onclick="x()">one</p>'
+                        '<script>var a;</script> two<!-- comment -->'
+                        '<iframe src="x"></iframe> <a href="javascript:x()">'
+                        'three</a>'),
+            '<p>one</p> two <a>three</a>')
+
+    def test_empty_values(self):
+        self.assertEqual(to_amp_html(''), '')
+        self.assertEqual(to_amp_html(None), '')
+
+
+class TestValidLanguages(NewsBlogTestCase):
+
+    def test_namespace_validity_is_memoized_until_urls_reload(self):
+        namespace = self.app_config.namespace
+        languages = get_valid_languages(namespace, self.language, site_id=1)
+        self.assertIn(self.language, languages)
+        cache = get_resolver_cache('valid_namespaces')
+        self.assertTrue(cache[(namespace, self.language, 1)])
+        self.assertEqual(
+            get_valid_languages(namespace, self.language, site_id=1),
+            languages)
+
+        clear_url_caches()
+        self.assertEqual(get_resolver_cache('valid_namespaces'), {})
+
+    def test_article_url_template(self):
+        namespace = '{0}:'.format(self.app_config.namespace)
+        for kwargs in [{'slug': 'an-article'},
+                       {'year': 2019, 'month': '02', 'slug': 'an-article'},
+                       {'year': 2019, 'month': '02', 'day': '03', 'pk': 12},
+                       {'slug': 'ein-kurzer-\xfcberblick'}]:
+            with override(self.language):
+                expected = reverse(
+                    '{0}article-detail'.format(namespace), kwargs=kwargs)
+            self.assertEqual(
+                reverse_article_url(namespace, kwargs, self.language),
+                expected)
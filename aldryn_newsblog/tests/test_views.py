@@ -4,11 +4,14 @@ from __future__ import unicode_literals
 
 import os
 from datetime import date, datetime
-from operator import itemgetter
+from operator import attrgetter, itemgetter
 from random import randint
 
 from django.conf import settings
 from django.core.files import File as DjangoFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import NoReverseMatch, reverse
 from django.utils.timezone import now
 from django.utils.translation import override
@@ -20,9 +23,13 @@ from filer.models.imagemodels import Image
 from parler.tests.utils import override_parler_settings
 from parler.utils.conf import add_default_language_settings
 from parler.utils.context import smart_override, switch_language
+from taggit.models import Tag
 
 from aldryn_newsblog.models import Article, NewsBlogConfig
 from aldryn_newsblog.search_indexes import ArticleIndex
+from aldryn_newsblog.utils.search import (
+    FulltextSearchBackend, get_search_backend,
+)
 
 from . import TESTS_STATIC_ROOT, NewsBlogTestCase
 
@@ -133,6 +140,26 @@ class TestViews(NewsBlogTestCase):
         for article in articles[2:]:
             self.assertContains(response_page_2, article.title)
 
+    def test_articles_list_exclude_featured_of_own_app_config(self):
+        self.app_config.exclude_featured = 1
+        self.app_config.save()
+        other_config = NewsBlogConfig.objects.create(namespace='other')
+        article = self.create_article()
+        other_featured = self.create_article(
+            app_config=other_config, is_featured=True)
+        list_url = reverse(
+            '{0}:article-list'.format(self.app_config.namespace))
+
+        response = self.client.get(list_url)
+        self.assertEqual(list(response.context['object_list']), [article])
+        self.assertNotContains(response, other_featured.title)
+
+        # a newly featured article is excluded right away
+        featured = self.create_article(is_featured=True)
+        response = self.client.get(list_url)
+        self.assertEqual(list(response.context['object_list']), [article])
+        self.assertNotContains(response, featured.title)
+
     def test_articles_list_pagination(self):
         namespace = self.app_config.namespace
         paginate_by = self.app_config.paginate_by
@@ -155,6 +182,79 @@ class TestViews(NewsBlogTestCase):
         for article in articles[paginate_by:]:
             self.assertContains(response, article.title)
 
+    def test_articles_list_keyset_pagination(self):
+        namespace = self.app_config.namespace
+        self.app_config.pagination_mode = 'keyset'
+        self.app_config.paginate_by = 2
+        self.app_config.save()
+        articles = [self.create_article(
+            publishing_date=datetime(2000 - i, 1, 1, 1, 1)
+        ) for i in range(5)]
+        list_url = reverse('{0}:article-list'.format(namespace))
+
+        pages = [self.client.get(list_url).context['page_obj']]
+        while pages[-1].next_cursor:
+            pages.append(self.client.get('{0}?cursor={1}'.format(
+                list_url, pages[-1].next_cursor)).context['page_obj'])
+        self.assertEqual(
+            [list(page.object_list) for page in pages],
+            [articles[0:2], articles[2:4], articles[4:]])
+        self.assertEqual([page.number for page in pages], [1, 2, 3])
+
+        previous_page = self.client.get('{0}?cursor={1}'.format(
+            list_url, pages[-1].previous_cursor)).context['page_obj']
+        self.assertEqual(list(previous_page.object_list), articles[2:4])
+        self.assertEqual(previous_page.number, 2)
+
+    def test_articles_list_keyset_pagination_count(self):
+        self.app_config.pagination_mode = 'keyset'
+        self.app_config.paginate_by = 2
+        self.app_config.save()
+        for _ in range(4):
+            self.create_article()
+        list_url = reverse(
+            '{0}:article-list'.format(self.app_config.namespace))
+        response = self.client.get(list_url)
+        self.assertEqual(response.context['paginator'].num_pages, 2)
+
+        # the cached count is dropped when an article is published
+        self.create_article()
+        response = self.client.get(list_url)
+        self.assertEqual(response.context['paginator'].num_pages, 3)
+
+    def test_article_detail_navigation(self):
+        same_date = datetime(2016, 6, 1)
+        oldest = self.create_article(publishing_date=datetime(2016, 5, 1))
+        # articles published at the same time are ordered by their pk
+        articles = [oldest] + sorted([
+            self.create_article(publishing_date=same_date)
+            for _ in range(3)], key=attrgetter('pk'))
+        for index, article in enumerate(articles):
+            response = self.client.get(article.get_absolute_url())
+            self.assertEqual(
+                response.context['prev_article'],
+                articles[index - 1] if index else None)
+            self.assertEqual(
+                response.context['next_article'],
+                articles[index + 1] if index + 1 < len(articles) else None)
+
+        # the cached navigation is dropped when an article is published
+        newest = self.create_article(publishing_date=datetime(2016, 7, 1))
+        response = self.client.get(articles[-1].get_absolute_url())
+        self.assertEqual(response.context['next_article'], newest)
+
+    def test_article_detail_navigation_untranslated(self):
+        older = self.create_article(publishing_date=datetime(2016, 5, 1))
+        newer = self.create_article(publishing_date=datetime(2016, 6, 1))
+        response = self.client.get(older.get_absolute_url())
+        self.assertEqual(response.context['next_article'], newer)
+
+        # the cached navigation does not link articles missing from the
+        # view's queryset
+        newer.translations.all().delete()
+        response = self.client.get(older.get_absolute_url())
+        self.assertIsNone(response.context['next_article'])
+
     def test_articles_by_author(self):
         author1, author2 = self.create_person(), self.create_person()
         for author in (author1, author2):
@@ -398,6 +498,42 @@ class TestVariousViews(NewsBlogTestCase):
         for article in untagged_articles:
             self.assertNotContains(response, article.title)
 
+    def test_article_search(self):
+        matching_articles = [
+            self.create_article(title='Attribution in practice'),
+            self.create_article(lead_in='<p>Multi-touch attribution</p>'),
+        ]
+        other_article = self.create_article(title='Cleaning television data')
+        unpublished_article = self.create_article(
+            title='Attribution drafts', is_published=False)
+        response = self.client.get(
+            reverse('{0}:article-search'.format(self.app_config.namespace)),
+            {'q': 'attribution'})
+        for article in matching_articles:
+            self.assertContains(response, article.title)
+        self.assertNotContains(response, other_article.title)
+        self.assertNotContains(response, unpublished_article.title)
+
+    def test_article_search_truncated(self):
+        if not isinstance(get_search_backend(), FulltextSearchBackend):
+            self.skipTest('only full-text searches are truncated')
+        for _ in range(3):
+            self.create_article(title='Attribution in practice')
+        url = reverse(
+            '{0}:article-search'.format(self.app_config.namespace))
+        with override_settings(ALDRYN_NEWSBLOG_SEARCH_MAX_RESULTS=2):
+            response = self.client.get(url, {'q': 'attribution'})
+        self.assertTrue(response.context['search_truncated'])
+        self.assertEqual(len(response.context['object_list']), 2)
+        self.assertContains(
+            response, 'Showing the 2 most relevant articles only.')
+
+        with override_settings(ALDRYN_NEWSBLOG_SEARCH_MAX_RESULTS=3):
+            response = self.client.get(url, {'q': 'attribution'})
+        self.assertFalse(response.context['search_truncated'])
+        self.assertEqual(len(response.context['object_list']), 3)
+        self.assertNotContains(response, 'most relevant articles only')
+
     def test_articles_by_unknown_tag(self):
         response = self.client.get(reverse(
             'aldryn_newsblog:article-list-by-tag',
@@ -425,6 +561,35 @@ class TestVariousViews(NewsBlogTestCase):
                     request=None, namespace=self.app_config.namespace
                 ), key=itemgetter('num_articles')), months)
 
+    def test_articles_count_by_month_is_cached(self):
+        namespace = self.app_config.namespace
+        self.create_article(publishing_date=date(1914, 7, 3))
+        months = Article.objects.get_months(request=None, namespace=namespace)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                Article.objects.get_months(
+                    request=None, namespace=namespace),
+                months)
+
+        self.create_article(publishing_date=date(1914, 7, 4))
+        self.assertEqual(
+            Article.objects.get_months(
+                request=None, namespace=namespace),
+            [{'date': date(1914, 7, 3), 'num_articles': 2}])
+
+    def test_articles_count_by_month_app_config_change(self):
+        namespace = self.app_config.namespace
+        article = self.create_article(publishing_date=date(1914, 7, 3))
+        self.assertEqual(
+            Article.objects.get_months(request=None, namespace=namespace),
+            [{'date': date(1914, 7, 3), 'num_articles': 1}])
+
+        article.app_config = NewsBlogConfig.objects.create(
+            namespace=self.rand_str())
+        article.save()
+        self.assertEqual(
+            Article.objects.get_months(request=None, namespace=namespace), [])
+
     def test_articles_count_by_author(self):
         authors = []
         for num_articles in [1, 3, 5]:
@@ -547,6 +712,115 @@ class TestVariousViews(NewsBlogTestCase):
             self.client.get(articles[0].get_absolute_url())
 
 
+class TestListingQueries(NewsBlogTestCase):
+
+    def add_articles(self, count, author, tag_name):
+        for _ in range(count):
+            article = self.create_article(
+                author=author, publishing_date=datetime(2016, 6, 1))
+            article.categories.add(self.category1)
+            article.tags.add(tag_name)
+
+    def get_query_counts(self, urls):
+        counts = {}
+        for url in urls:
+            # the first request fills the caches, the second one is counted
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            counts[url] = len(queries)
+        return counts
+
+    def test_list_views_query_count_does_not_depend_on_articles(self):
+        author = self.create_person()
+        tag_name = self.rand_str()
+        self.add_articles(2, author, tag_name)
+        urls = [
+            reverse('aldryn_newsblog:article-list'),
+            reverse('aldryn_newsblog:article-list-by-author',
+                    kwargs={'author': author.slug}),
+            reverse('aldryn_newsblog:article-list-by-category',
+                    kwargs={'category': self.category1.slug}),
+            reverse('aldryn_newsblog:article-list-by-tag',
+                    kwargs={'tag': Tag.objects.get(name=tag_name).slug}),
+            reverse('aldryn_newsblog:article-list-by-year',
+                    kwargs={'year': '2016'}),
+            reverse('aldryn_newsblog:article-list-by-month',
+                    kwargs={'year': '2016', 'month': '6'}),
+            reverse('aldryn_newsblog:article-list-by-day',
+                    kwargs={'year': '2016', 'month': '6', 'day': '1'}),
+        ]
+        few_articles = self.get_query_counts(urls)
+        self.add_articles(5, author, tag_name)
+        more_articles = self.get_query_counts(urls)
+        for url in urls:
+            self.assertEqual(more_articles[url], few_articles[url], url)
+
+    def test_with_listing_prefetch(self):
+        self.add_articles(3, self.create_person(), self.rand_str())
+        articles = list(Article.objects.published().with_listing_prefetch(
+            [self.language]))
+        with self.assertNumQueries(0):
+            for article in articles:
+                article.title
+                str(article.author)
+                [category.name for category in article.categories.all()]
+                [tag.name for tag in article.tags.all()]
+                article.featured_image
+                article.app_config.namespace
+
+
+class TestResponseCache(NewsBlogTestCase):
+
+    @override_settings(ALDRYN_NEWSBLOG_RESPONSE_CACHE_TIMEOUT=300)
+    def test_article_detail_response_is_cached(self):
+        article = self.create_article()
+        url = article.get_absolute_url()
+        response = self.client.get(url)
+        self.assertContains(response, article.title)
+        self.assertIn('public', response['Cache-Control'])
+        etag = response['ETag']
+
+        # changes made without the signals are not seen
+        Article._parler_meta.root_model.objects.filter(
+            master=article).update(title='Changed title')
+        response = self.client.get(url)
+        self.assertContains(response, article.title)
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # saving the article outdates the cached response
+        Article.objects.get(pk=article.pk).save()
+        response = self.client.get(url)
+        self.assertContains(response, 'Changed title')
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(ALDRYN_NEWSBLOG_RESPONSE_CACHE_TIMEOUT=300)
+    def test_article_detail_response_cache_ignores_unread_params(self):
+        article = self.create_article()
+        url = article.get_absolute_url()
+        response = self.client.get(url)
+        self.assertIn('Cookie', response['Vary'])
+        etag = response['ETag']
+
+        Article._parler_meta.root_model.objects.filter(
+            master=article).update(title='Changed title')
+        response = self.client.get(url, {'utm_source': 'newsletter'})
+        self.assertContains(response, article.title)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('Cookie', response['Vary'])
+
+    @override_settings(ALDRYN_NEWSBLOG_RESPONSE_CACHE_TIMEOUT=300)
+    def test_article_detail_response_is_cached_for_anonymous_only(self):
+        article = self.create_article()
+        url = article.get_absolute_url()
+        self.client.force_login(self.create_user())
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('ETag'))
+
+
 class TestIndex(NewsBlogTestCase):
     def test_index_simple(self):
         self.request = self.get_request('en')
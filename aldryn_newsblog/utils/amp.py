@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Conversion of article HTML to AMP markup.
+
+The AMP version of an article's lead-in is built once, when the translation
+is saved (see Article.amp_lead_in), so that the AMP view serves it as is.
+"""
+from __future__ import unicode_literals
+
+from django.utils.six import string_types
+
+import lxml.html
+from lxml import etree
+
+# Elements AMP does not allow, dropped along with their content.
+DISALLOWED_TAGS = frozenset([
+    'applet', 'audio', 'base', 'embed', 'form', 'frame', 'frameset',
+    'iframe', 'input', 'link', 'meta', 'noscript', 'object', 'param',
+    'script', 'select', 'style', 'textarea', 'video',
+])
+
+# Attributes AMP does not allow, besides the on* event handlers.
+DISALLOWED_ATTRIBUTES = frozenset(['style', 'xmlns'])
+
+# The attributes an <img> keeps as an <amp-img>.
+AMP_IMG_ATTRIBUTES = ('src', 'srcset', 'sizes', 'alt', 'title', 'width',
+                      'height')
+
+
+def _is_dimension(value):
+    return bool(value) and value.isdigit() and int(value) > 0
+
+
+def _convert_img(element):
+    """
+    Turns an <img> into a responsive <amp-img>. AMP needs the size of an
+    image to lay it out, images without width and height are dropped.
+    """
+    width, height = element.get('width', ''), element.get('height', '')
+    if not (element.get('src') and _is_dimension(width) and  # noqa: W504
+            _is_dimension(height)):
+        return False
+    attributes = dict(
+        (name, element.get(name)) for name in AMP_IMG_ATTRIBUTES
+        if element.get(name) is not None)
+    element.attrib.clear()
+    element.attrib.update(attributes)
+    element.set('layout', 'responsive')
+    element.tag = 'amp-img'
+    return True
+
+
+def _clean(parent):
+    for element in list(parent):
+        if (not isinstance(element.tag, string_types) or  # noqa: W504
+                element.tag in DISALLOWED_TAGS):
+            # drop_tree() keeps the text following the element
+            element.drop_tree()
+            continue
+        if element.tag == 'img':
+            if not _convert_img(element):
+                element.drop_tree()
+            continue
+        for name in list(element.attrib):
+            if name in DISALLOWED_ATTRIBUTES or name.startswith('on'):
+                del element.attrib[name]
+        if element.get('href', '').strip().lower().startswith('javascript:'):
+            del element.attrib['href']
+        _clean(element)
+
+
+def to_amp_html(value):
+    """
+    Returns the given HTML fragment as AMP-valid markup: images become
+    <amp-img>, disallowed elements, comments, inline styles, event handlers
+    and javascript: links are removed.
+    """
+    if not value or not value.strip():
+        return ''
+    root = lxml.html.fragment_fromstring(value, create_parent='div')
+    _clean(root)
+    html = etree.tostring(root, encoding='unicode', method='html')
+    # without the <div> fragment_fromstring() wrapped the fragment in
+    return html[len('<div>'):-len('</div>')]
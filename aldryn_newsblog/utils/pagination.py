@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Keyset (seek) pagination of the article lists.
+
+Instead of OFFSET, a page is selected by the (publishing_date, pk) of the
+last article of the previous page (or of the first article of the next page
+when going back), so every page costs the same as the first one. The cursor
+is passed around as an opaque token. Page numbers, for the page number
+widget, are carried in the token and the total count is an approximate,
+cached one.
+"""
+from __future__ import unicode_literals
+
+import base64
+import binascii
+import json
+import math
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes, force_text
+from django.utils.functional import cached_property
+from django.utils.six.moves import range
+
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+def encode_cursor(article, direction, number):
+    """
+    Returns the token of the page next to (FORWARD) or before (BACKWARD) the
+    given article, which is page `number`.
+    """
+    data = [article.publishing_date.isoformat(), article.pk, direction, number]
+    return force_text(base64.urlsafe_b64encode(
+        force_bytes(json.dumps(data, separators=(',', ':'))))).rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Returns the (publishing_date, pk, direction, number) of a token made by
+    encode_cursor(), or None if it is not a valid one.
+    """
+    if not token:
+        return None
+    try:
+        data = json.loads(force_text(base64.urlsafe_b64decode(
+            force_bytes(token + '=' * (-len(token) % 4)))))
+        publishing_date, pk, direction, number = data
+        publishing_date = parse_datetime(publishing_date)
+        pk, number = int(pk), int(number)
+    except (TypeError, ValueError, binascii.Error):
+        return None
+    if publishing_date is None or direction not in (FORWARD, BACKWARD):
+        return None
+    return publishing_date, pk, direction, max(number, 1)
+
+
+class CountedPaginator(Paginator):
+    """A Paginator using a given, e.g. cached or approximate, count."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super(CountedPaginator, self).__init__(object_list, per_page, **kwargs)
+        self.__dict__['count'] = count
+
+
+class KeysetPage(object):
+    """
+    The parts of django's Page the pagination templates use, plus the tokens
+    of the next and previous pages.
+    """
+
+    def __init__(self, object_list, number, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Page {0}>'.format(self.number)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class KeysetPaginator(object):
+    """
+    Pages through a queryset ordered by (-publishing_date, -pk). Only the
+    number of pages relies on the given count, the pages themselves do not.
+    """
+
+    def __init__(self, object_list, per_page, count):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.count = count
+
+    @cached_property
+    def num_pages(self):
+        return max(int(math.ceil(self.count / float(self.per_page))), 1)
+
+    @property
+    def page_range(self):
+        return range(1, self.num_pages + 1)
+
+    def page(self, cursor):
+        """Returns the page of a cursor returned by decode_cursor()."""
+        publishing_date, pk, direction, number = cursor
+        if direction == FORWARD:
+            queryset = self.object_list.filter(
+                Q(publishing_date__lt=publishing_date) |  # noqa: W504
+                Q(publishing_date=publishing_date, pk__lt=pk),
+            ).order_by('-publishing_date', '-pk')
+        else:
+            queryset = self.object_list.filter(
+                Q(publishing_date__gt=publishing_date) |  # noqa: W504
+                Q(publishing_date=publishing_date, pk__gt=pk),
+            ).order_by('publishing_date', 'pk')
+        # one more, to know whether there is a page after this one
+        articles = list(queryset[:self.per_page + 1])
+        has_more = len(articles) > self.per_page
+        articles = articles[:self.per_page]
+
+        if direction == FORWARD:
+            has_next, has_previous = has_more, True
+        else:
+            articles.reverse()
+            has_next, has_previous = True, has_more
+        return self.get_page(articles, number, has_next, has_previous)
+
+    def get_page(self, articles, number, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if articles and has_next:
+            next_cursor = encode_cursor(articles[-1], FORWARD, number + 1)
+        if articles and has_previous:
+            previous_cursor = encode_cursor(articles[0], BACKWARD, number - 1)
+        return KeysetPage(
+            articles, number, self, next_cursor, previous_cursor)
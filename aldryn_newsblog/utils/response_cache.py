@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Full-response cache of the article detail and AMP views.
+
+It is opt-in: set ALDRYN_NEWSBLOG_RESPONSE_CACHE_TIMEOUT to the number of
+seconds a response may be kept. Only GET and HEAD requests of anonymous
+visitors outside of the toolbar's edit mode are cached, keyed by site,
+language, path and the query parameters the view reads; other parameters,
+e.g. campaign tracking ones, share the entry of the plain url.
+
+Each entry keeps the version tokens (see aldryn_newsblog.managers.
+get_versions) of the surrogate keys it was rendered from, e.g.
+'article:<pk>', 'articles:<app config pk>' or 'tag:<pk>', and is only served
+while all of them are unchanged. The signal receivers in
+aldryn_newsblog.models change the tokens when an article, its translations,
+plugins, tags or related articles change.
+
+Responses carry an ETag, a public Cache-Control max-age of
+ALDRYN_NEWSBLOG_RESPONSE_CACHE_MAX_AGE seconds (60 by default) and Vary:
+Cookie, so that a CDN and the browsers can keep and revalidate them as well
+without serving them to logged-in editors.
+"""
+from __future__ import unicode_literals
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers,
+)
+from django.utils.encoding import force_bytes
+from django.utils.http import quote_etag
+from django.utils.translation import get_language
+
+from aldryn_newsblog.compat import toolbar_edit_mode_active
+from aldryn_newsblog.managers import get_versions
+
+
+def get_response_cache_timeout():
+    return getattr(settings, 'ALDRYN_NEWSBLOG_RESPONSE_CACHE_TIMEOUT', None)
+
+
+def get_response_max_age():
+    return getattr(settings, 'ALDRYN_NEWSBLOG_RESPONSE_CACHE_MAX_AGE', 60)
+
+
+def get_toolbar_params():
+    """Returns the query parameters switching the cms toolbar's modes."""
+    return [
+        getattr(settings, name, default) for name, default in (
+            ('CMS_TOOLBAR_URL__EDIT_ON', 'edit'),
+            ('CMS_TOOLBAR_URL__EDIT_OFF', 'edit_off'),
+            ('CMS_TOOLBAR_URL__BUILD', 'structure'),
+            ('CMS_TOOLBAR_URL__DISABLE', 'toolbar_off'),
+        )]
+
+
+def is_cacheable_request(request):
+    """
+    Returns whether the response to the given request is the same for all
+    visitors and the response cache is enabled.
+    """
+    if not get_response_cache_timeout():
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if any(param in request.GET for param in get_toolbar_params()):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return False
+    return not (getattr(request, 'toolbar', None) and  # noqa: W504
+                toolbar_edit_mode_active(request))
+
+
+def get_response_cache_key(request, params=()):
+    """
+    Returns the cache key of the response to the request. Of the query
+    string, only the given parameters are part of it.
+    """
+    query = [(param, request.GET.getlist(param))
+             for param in sorted(params) if param in request.GET]
+    digest = hashlib.md5(
+        force_bytes(json.dumps([request.path, query]))).hexdigest()
+    return 'aldryn_newsblog:response:{0}:{1}:{2}'.format(
+        getattr(settings, 'SITE_ID', None), get_language(), digest)
+
+
+def patch_response_headers(request, response, etag):
+    """
+    Adds the validators and caching headers to the response and returns it,
+    or a 304 response if the client's copy is still current.
+    """
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=get_response_max_age())
+    # logged-in editors get other responses for the same url
+    patch_vary_headers(response, ['Cookie'])
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+def get_cached_response(request, cache_key):
+    """
+    Returns the cached response of the request, or None if there is none or
+    if anything it was rendered from changed since.
+    """
+    entry = cache.get(cache_key)
+    if entry is None or get_versions(entry['versions']) != entry['versions']:
+        return None
+    response = HttpResponse(
+        entry['content'], content_type=entry['content_type'])
+    return patch_response_headers(request, response, entry['etag'])
+
+
+def cache_response(request, cache_key, response, surrogate_keys, timeout):
+    """
+    Renders and stores the response along with the version tokens of the
+    given surrogate keys, unless it is not the same for every visitor, e.g.
+    because it sets a cookie or contains a CSRF token. Returns the response
+    to send.
+    """
+    if response.status_code != 200 or response.streaming:
+        return response
+    # the tokens are read before rendering, so that changes made meanwhile
+    # outdate the entry
+    versions = get_versions(surrogate_keys)
+    if hasattr(response, 'render'):
+        response.render()
+    if response.cookies or request.META.get('CSRF_COOKIE_USED'):
+        return response
+    etag = quote_etag(hashlib.md5(response.content).hexdigest())
+    cache.set(cache_key, {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'etag': etag,
+        'versions': versions,
+    }, timeout)
+    return patch_response_headers(request, response, etag)
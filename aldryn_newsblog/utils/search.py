@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Search backends for the article search view (ArticleSearchResultsList).
+
+Full-text backends rank the matching article translations in the database
+and hand back the article pks ordered by relevance. The default backend is
+picked from the database vendor and can be overridden with the
+ALDRYN_NEWSBLOG_SEARCH_BACKEND setting (a dotted path to a backend class).
+
+Full-text searches only rank the ALDRYN_NEWSBLOG_SEARCH_MAX_RESULTS (500 by
+default) most relevant articles, the result pages stop there. The backend's
+`truncated` tells whether more articles matched, the search view shows it.
+"""
+from __future__ import unicode_literals
+
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils.module_loading import import_string
+
+from .utilities import get_cleaned_bits
+
+
+logger = logging.getLogger(__name__)
+
+# The translated fields that are searched, in the order they are indexed.
+SEARCH_FIELDS = ('title', 'lead_in', 'search_data')
+
+# Full-text indexes skip very short words, queries made of those only are
+# answered by the icontains backend.
+MIN_TERM_LENGTH = getattr(
+    settings, 'ALDRYN_NEWSBLOG_SEARCH_MIN_TERM_LENGTH', 3)
+
+# Operators that switch MySQL to boolean mode when they start a word...
+MYSQL_BOOLEAN_PREFIXES = '+-<>~('
+# ...and anywhere in a word.
+MYSQL_BOOLEAN_OPERATORS = '()*"'
+
+
+def get_max_results():
+    """
+    Returns how many of the most relevant articles a full-text search
+    returns at most.
+    """
+    return getattr(settings, 'ALDRYN_NEWSBLOG_SEARCH_MAX_RESULTS', 500)
+
+
+def get_query_terms(query):
+    """
+    Splits a search query into terms the same way get_cleaned_bits() splits the
+    indexed text. Quoted phrases are kept together, without their quotes.
+    """
+    terms = []
+    for bit in get_cleaned_bits(query):
+        bit = bit.strip('"\'').strip()
+        if bit:
+            terms.append(bit)
+    return terms
+
+
+def is_boolean_query(query):
+    """
+    Returns whether the query uses MySQL boolean operators. A hyphen only
+    counts at the start of a word, "real-time" is not "real" without "time".
+    """
+    return any(
+        word[0] in MYSQL_BOOLEAN_PREFIXES or  # noqa: W504
+        any(char in word for char in MYSQL_BOOLEAN_OPERATORS)
+        for word in query.split())
+
+
+def quote_hyphenated_words(query):
+    """
+    Quotes the hyphenated words of a boolean query, as MySQL would otherwise
+    exclude what follows their hyphens.
+    """
+    words = []
+    for word in query.split():
+        if '-' in word[1:] and '"' not in word:
+            prefix = word[0] if word[0] in MYSQL_BOOLEAN_PREFIXES else ''
+            word = '{0}"{1}"'.format(prefix, word[len(prefix):])
+        words.append(word)
+    return ' '.join(words)
+
+
+class IcontainsSearchBackend(object):
+    """
+    Matches the query as a substring of the title, lead-in or search data.
+    Works everywhere, but scans the whole translation table. It needs no
+    index, install() does nothing.
+    """
+    # whether the last search() left out matching articles
+    truncated = False
+
+    def install(self, connection, translation_model):
+        pass
+
+    def search(self, queryset, query, languages):
+        return queryset.filter(
+            Q(translations__title__icontains=query) |  # noqa: #W504
+            Q(translations__lead_in__icontains=query) |  # noqa: #W504
+            Q(translations__search_data__icontains=query)
+        ).distinct()
+
+
+class FulltextSearchBackend(IcontainsSearchBackend):
+    """
+    Base class of the backends using a full-text index of the translation
+    table. Subclasses create the index in install() and implement
+    get_ranked_ids(connection, translation_model, query, languages, limit),
+    which returns the pks of (at most `limit`) articles matching the query in
+    one of the given languages, the most relevant first. Queries the index
+    cannot answer fall back to the icontains search.
+
+    search() asks for one more than get_max_results() articles, to tell
+    whether the results were truncated.
+    """
+
+    def search(self, queryset, query, languages):
+        terms = get_query_terms(query)
+        if not any(len(term) >= MIN_TERM_LENGTH for term in terms):
+            return super(FulltextSearchBackend, self).search(
+                queryset, query, languages)
+
+        connection = connections[queryset.db]
+        translation_model = queryset.model._parler_meta.root_model
+        max_results = get_max_results()
+        try:
+            with transaction.atomic(using=queryset.db):
+                article_ids = self.get_ranked_ids(
+                    connection, translation_model, query, languages,
+                    max_results + 1)
+        except DatabaseError:
+            logger.warning(
+                'Full-text search failed, is the index installed? Falling '
+                'back to icontains search.', exc_info=True)
+            return super(FulltextSearchBackend, self).search(
+                queryset, query, languages)
+
+        self.truncated = len(article_ids) > max_results
+        article_ids = article_ids[:max_results]
+        if not article_ids:
+            return queryset.none()
+        search_rank = Case(
+            *[When(pk=pk, then=Value(rank))
+              for rank, pk in enumerate(article_ids)],
+            output_field=IntegerField())
+        return queryset.filter(pk__in=article_ids).annotate(
+            search_rank=search_rank).order_by('search_rank').distinct()
+
+    @staticmethod
+    def unique_ids(rows):
+        """Returns the first column of rows, without duplicates, in order."""
+        seen = set()
+        article_ids = []
+        for row in rows:
+            if row[0] not in seen:
+                seen.add(row[0])
+                article_ids.append(row[0])
+        return article_ids
+
+
+class MySQLFulltextSearchBackend(FulltextSearchBackend):
+    """
+    Uses a MySQL FULLTEXT index. Queries with boolean operators (+word, -word,
+    "a phrase", prefix*) are run in boolean mode, all others in natural
+    language mode.
+    """
+    index_name = 'aldryn_newsblog_article_translation_fulltext'
+
+    def install(self, connection, translation_model):
+        table = translation_model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SHOW INDEX FROM {0} WHERE Key_name = %s'.format(
+                    connection.ops.quote_name(table)),
+                [self.index_name])
+            if cursor.fetchone():
+                return
+            cursor.execute('CREATE FULLTEXT INDEX {0} ON {1} ({2})'.format(
+                connection.ops.quote_name(self.index_name),
+                connection.ops.quote_name(table),
+                ', '.join(connection.ops.quote_name(field)
+                          for field in SEARCH_FIELDS)))
+
+    def get_ranked_ids(self, connection, translation_model, query, languages,
+                       limit):
+        if is_boolean_query(query):
+            mode = 'BOOLEAN'
+            query = quote_hyphenated_words(query)
+        else:
+            mode = 'NATURAL LANGUAGE'
+            query = ' '.join(get_query_terms(query))
+        match = 'MATCH ({0}) AGAINST (%s IN {1} MODE)'.format(
+            ', '.join(connection.ops.quote_name(field)
+                      for field in SEARCH_FIELDS),
+            mode)
+        sql = (
+            'SELECT master_id, {match} AS score FROM {table} '
+            'WHERE {match} AND language_code IN ({languages}) '
+            'ORDER BY score DESC LIMIT %s'
+        ).format(
+            match=match,
+            table=connection.ops.quote_name(
+                translation_model._meta.db_table),
+            languages=', '.join(['%s'] * len(languages)))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql, [query, query] + list(languages) + [limit])
+            return self.unique_ids(cursor.fetchall())
+
+
+class SQLiteFTS5SearchBackend(FulltextSearchBackend):
+    """
+    Uses an external content FTS5 table, kept in sync with the translation
+    table by triggers. Meant for local development.
+    """
+
+    def get_fts_table(self, translation_model):
+        return '{0}_fts'.format(translation_model._meta.db_table)
+
+    def install(self, connection, translation_model):
+        table = translation_model._meta.db_table
+        fts_table = self.get_fts_table(translation_model)
+        columns = ', '.join(SEARCH_FIELDS)
+        new_values = ', '.join('new.{0}'.format(f) for f in SEARCH_FIELDS)
+        old_values = ', '.join('old.{0}'.format(f) for f in SEARCH_FIELDS)
+        delete_old = (
+            "INSERT INTO {fts}({fts}, rowid, {columns}) "
+            "VALUES ('delete', old.id, {old_values});")
+        insert_new = (
+            "INSERT INTO {fts}(rowid, {columns}) "
+            "VALUES (new.id, {new_values});")
+        statements = [
+            "CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            "{columns}, content='{table}', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 1')",
+            "CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} "
+            "BEGIN " + insert_new + " END",
+            "CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} "
+            "BEGIN " + delete_old + " END",
+            "CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} "
+            "BEGIN " + delete_old + " " + insert_new + " END",
+            "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement.format(
+                    fts=fts_table, table=table, columns=columns,
+                    new_values=new_values, old_values=old_values))
+
+    def get_ranked_ids(self, connection, translation_model, query, languages,
+                       limit):
+        # every term is quoted, so that FTS5 treats it as a plain (phrase)
+        # token instead of parsing it as a query expression
+        match = ' '.join(
+            '"{0}"'.format(term.replace('"', '""'))
+            for term in get_query_terms(query))
+        fts_table = self.get_fts_table(translation_model)
+        sql = (
+            'SELECT t.master_id FROM {fts} '
+            'JOIN {table} t ON t.id = {fts}.rowid '
+            'WHERE {fts} MATCH %s AND t.language_code IN ({languages}) '
+            'ORDER BY bm25({fts}) LIMIT %s'
+        ).format(
+            fts=fts_table,
+            table=translation_model._meta.db_table,
+            languages=', '.join(['%s'] * len(languages)))
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [match] + list(languages) + [limit])
+            return self.unique_ids(cursor.fetchall())
+
+
+DEFAULT_BACKENDS = {
+    'mysql': MySQLFulltextSearchBackend,
+    'sqlite': SQLiteFTS5SearchBackend,
+}
+
+
+def get_search_backend(using='default'):
+    """
+    Returns the configured search backend, or the default one for the vendor
+    of the given database.
+    """
+    backend_path = getattr(settings, 'ALDRYN_NEWSBLOG_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    vendor = connections[using].vendor
+    return DEFAULT_BACKENDS.get(vendor, IcontainsSearchBackend)()
+
+
+def install_search_backend(using='default', **kwargs):
+    """
+    Creates the full-text index of the configured search backend. Connected
+    to post_migrate, so it runs after every migrate.
+    """
+    from aldryn_newsblog.models import Article
+
+    try:
+        get_search_backend(using).install(
+            connections[using], Article._parler_meta.root_model)
+    except DatabaseError:
+        logger.warning('Could not install the article full-text index.',
+                       exc_info=True)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Deferred updates of Article.search_data.
+
+Saving a content plugin only schedules an update of its article's search
+data, once per article and language however many plugins the transaction
+saves. What happens when the transaction commits depends on
+ALDRYN_NEWSBLOG_SEARCH_DATA_WORKER:
+
+'deferred' (the default)
+    The translation is marked as outdated, by emptying its search_data_hash,
+    which is a single UPDATE whatever the size of the article. The search
+    data is then rebuilt outside of the request by
+    `manage.py rebuild_article_search_data --outdated`, run on a schedule
+    (e.g. the Zappa event of deductive.events). The mark is stored in the
+    database, so nothing is lost when a process is frozen or stopped.
+
+'sync'
+    The search data is rebuilt right away, in the request that saved the
+    plugins.
+"""
+from __future__ import unicode_literals
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+
+from parler.utils.context import switch_language
+
+
+def get_worker_mode():
+    return getattr(settings, 'ALDRYN_NEWSBLOG_SEARCH_DATA_WORKER', 'deferred')
+
+
+def update_article_search_data(article_pk, language):
+    """
+    Rebuilds the search data of one article translation, writing only the
+    search_data (and search_data_hash) columns.
+    """
+    Article = apps.get_model('aldryn_newsblog', 'Article')
+    try:
+        article = Article.objects.get(pk=article_pk)
+    except Article.DoesNotExist:
+        return
+    with switch_language(article, language_code=language):
+        search_data = article.get_search_data(language)
+        search_data_hash = article.get_search_data_hash(language)
+    article.translations.filter(language_code=language).update(
+        search_data=search_data, search_data_hash=search_data_hash)
+
+
+def mark_article_search_data_outdated(article_pk, language):
+    """
+    Marks the search data of one article translation as outdated, for
+    rebuild_article_search_data --outdated to rebuild it. An empty
+    search_data_hash never matches the fingerprint of any content.
+    """
+    Article = apps.get_model('aldryn_newsblog', 'Article')
+    Article._parler_meta.root_model.objects.filter(
+        master_id=article_pk, language_code=language,
+    ).update(search_data_hash='')
+
+
+def get_scheduled_updates():
+    """
+    Returns the set of the (article pk, language) pairs whose update is
+    already registered with the current transaction of the default
+    connection. The set is reset whenever the list of the connection's
+    on_commit callbacks is replaced, i.e. on commit or rollback.
+    """
+    run_on_commit, scheduled = getattr(
+        connection, '_search_data_updates', (None, None))
+    if run_on_commit is not connection.run_on_commit:
+        scheduled = set()
+        connection._search_data_updates = (connection.run_on_commit,
+                                           scheduled)
+    return scheduled
+
+
+def schedule_search_data_update(article_pk, language):
+    """
+    Schedules an update of the search data of the given article translation
+    for when the current transaction commits (or right away, outside of a
+    transaction). Further calls for the same translation in the same
+    transaction do nothing.
+    """
+    if get_worker_mode() == 'sync':
+        update = update_article_search_data
+    else:
+        update = mark_article_search_data_outdated
+    if not connection.in_atomic_block:
+        update(article_pk, language)
+        return
+    scheduled = get_scheduled_updates()
+    if (article_pk, language) in scheduled:
+        return
+    scheduled.add((article_pk, language))
+    transaction.on_commit(lambda: update(article_pk, language))
@@ -2,22 +2,29 @@
 
 from __future__ import unicode_literals
 
+import hashlib
+import re
+from collections import OrderedDict
+
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.sites.models import Site
 from django.contrib.sites.shortcuts import get_current_site
 from django.db import models
 from django.test import RequestFactory
-from django.urls import NoReverseMatch, reverse
+from django.urls import (
+    NoReverseMatch, get_resolver, get_script_prefix, get_urlconf, reverse,
+)
 from django.utils import translation
-from django.utils.encoding import force_text
-from django.utils.html import strip_tags as _strip_tags
+from django.utils.encoding import force_bytes, force_text
+from django.utils.six import string_types
 from django.utils.text import smart_split
 
 from cms.plugin_rendering import ContentRenderer
 from cms.utils.i18n import force_language, get_language_object
 
-from lxml.html.clean import Cleaner as LxmlCleaner
+import lxml.html
+from lxml import etree
 
 
 def default_reverse(*args, **kwargs):
@@ -56,19 +63,55 @@ def get_request(language=None):
     return request
 
 
+# Elements whose text is not part of the readable content.
+NON_TEXT_TAGS = frozenset(['script', 'style'])
+
+STRIP_TAGS_CACHE_SIZE = getattr(
+    settings, 'ALDRYN_NEWSBLOG_STRIP_TAGS_CACHE_SIZE', 2048)
+
+_stripped_values = {}
+
+
+def _extract_text(value):
+    """
+    Returns the text of an HTML fragment, in a single pass over the parsed
+    tree. The text of script and style elements and of comments is dropped,
+    their tail (the text following them) is kept.
+    """
+    try:
+        root = lxml.html.fragment_fromstring(value, create_parent='div')
+    except etree.ParserError:
+        return ''
+    bits = []
+    for element in root.iter():
+        if isinstance(element.tag, string_types) and (
+                element.tag not in NON_TEXT_TAGS):
+            bits.append(element.text or '')
+        if element is not root:
+            bits.append(element.tail or '')
+    return ''.join(bits)
+
+
 def strip_tags(value):
     """
     Returns the given HTML with all tags stripped.
-    We use lxml to strip all js tags and then hand the result to django's
-    strip tags.
+    The text is extracted with lxml, without the contents of js and css
+    tags. Results are memoized by the hash of the value, so that plugins
+    that did not change are not parsed again when articles are re-indexed.
     """
     # strip any new lines
     if value:
         value = value.strip()
 
     if value:
-        partial_strip = LxmlCleaner().clean_html(value)
-        value = _strip_tags(partial_strip)
+        key = hashlib.md5(force_bytes(value)).digest()
+        stripped = _stripped_values.get(key)
+        if stripped is None:
+            stripped = _extract_text(value)
+            if len(_stripped_values) >= STRIP_TAGS_CACHE_SIZE:
+                _stripped_values.clear()
+            _stripped_values[key] = stripped
+        value = stripped
     return value
 
 
@@ -168,13 +211,36 @@ def is_valid_namespace(namespace):
     return True
 
 
-def is_valid_namespace_for_language(namespace, language_code):
+def get_resolver_cache(name):
+    """
+    Returns a dict for memoizing things computed from the URL patterns. It is
+    kept on the current URL resolver, so it goes away with it whenever the URLs
+    are reloaded, e.g. by cms' ApphookReloadMiddleware after an apphook change.
+    """
+    resolver = get_resolver(get_urlconf())
+    attribute = '_newsblog_{0}'.format(name)
+    try:
+        return getattr(resolver, attribute)
+    except AttributeError:
+        setattr(resolver, attribute, {})
+        return getattr(resolver, attribute)
+
+
+def is_valid_namespace_for_language(namespace, language_code, site_id=None):
     """
     Check if provided namespace has an app-hooked page for given language_code.
     Returns True or False.
     """
+    cache = get_resolver_cache('valid_namespaces')
+    key = (namespace, language_code, site_id)
+    try:
+        return cache[key]
+    except KeyError:
+        pass
     with force_language(language_code):
-        return is_valid_namespace(namespace)
+        is_valid = is_valid_namespace(namespace)
+    cache[key] = is_valid
+    return is_valid
 
 
 def get_valid_languages_from_request(namespace, request):
@@ -197,5 +263,68 @@ def get_valid_languages(namespace, language_code, site_id=None):
         langs += list(fallbacks)
     valid_translations = [
         lang_code for lang_code in langs
-        if is_valid_namespace_for_language(namespace, lang_code)]
+        if is_valid_namespace_for_language(namespace, lang_code, site_id)]
     return valid_translations
+
+
+# The kwargs of the article-detail urls, in the order they appear in the url,
+# with a sample value and the pattern of the values a url template can be
+# filled with.
+ARTICLE_URL_KWARGS = OrderedDict([
+    ('year', ('2000', re.compile(r'^\d{4}$'))),
+    ('month', ('01', re.compile(r'^\d{1,2}$'))),
+    ('day', ('01', re.compile(r'^\d{1,2}$'))),
+    ('pk', ('1', re.compile(r'^\d+$'))),
+    ('slug', ('slug', re.compile(r'^[a-zA-Z0-9_][-a-zA-Z0-9_]*$'))),
+])
+
+
+def get_article_url_template(namespace, kwarg_names, language):
+    """
+    Returns a format string building the article-detail url of the given
+    namespace (with its trailing colon, if any) and language from the given
+    kwargs, or None if the url can not be built that way.
+    """
+    cache = get_resolver_cache('article_url_templates')
+    key = (namespace, kwarg_names, language, get_script_prefix())
+    try:
+        return cache[key]
+    except KeyError:
+        pass
+    sample_kwargs = dict(
+        (name, ARTICLE_URL_KWARGS[name][0]) for name in kwarg_names)
+    template = None
+    try:
+        with translation.override(language):
+            url = reverse('{0}article-detail'.format(namespace),
+                          kwargs=sample_kwargs)
+    except NoReverseMatch:
+        url = ''
+    # The kwargs are the last path segments of the url.
+    bits = url.split('/')
+    count = len(kwarg_names)
+    if url.endswith('/') and count and bits[-1 - count:-1] == [
+            sample_kwargs[name] for name in kwarg_names]:
+        template = '/'.join(
+            bits[:-1 - count] +  # noqa: W504
+            ['{%s}' % name for name in kwarg_names] + [''])
+    cache[key] = template
+    return template
+
+
+def reverse_article_url(namespace, kwargs, language):
+    """
+    Returns the article-detail url for the given kwargs. The url is built
+    from the memoized url template of the namespace, and only reversed if
+    there is none or a value would need escaping.
+    """
+    names = tuple(name for name in ARTICLE_URL_KWARGS if name in kwargs)
+    values = dict((name, force_text(kwargs[name])) for name in names)
+    if len(names) == len(kwargs) and all(
+            ARTICLE_URL_KWARGS[name][1].match(values[name])
+            for name in names):
+        template = get_article_url_template(namespace, names, language)
+        if template is not None:
+            return template.format(**values)
+    with translation.override(language):
+        return reverse('{0}article-detail'.format(namespace), kwargs=kwargs)
@@ -2,15 +2,19 @@
 
 from __future__ import unicode_literals
 
+import hashlib
+import json
 from datetime import date, datetime
+from django.conf import settings
+from django.core.cache import cache
 from django.db import OperationalError
 
-from django.db.models import Q
 from django.http import (
     Http404, HttpResponsePermanentRedirect, HttpResponseRedirect,
 )
 from django.shortcuts import get_object_or_404
 from django.utils import translation
+from django.utils.encoding import force_bytes
 from django.views.generic import ListView
 from django.views.generic.detail import DetailView
 from django.core.urlresolvers import resolve
@@ -27,9 +31,24 @@ from taggit.models import Tag
 from aldryn_newsblog.compat import toolbar_edit_mode_active
 from aldryn_newsblog.utils.utilities import get_valid_languages_from_request
 
+from .managers import NAVIGATION_CACHE_TIMEOUT, get_articles_version
 from .models import Article
 from .utils import add_prefix_to_path
+from .utils.pagination import (
+    BACKWARD, FORWARD, CountedPaginator, KeysetPaginator, decode_cursor,
+    encode_cursor,
+)
+from .utils.response_cache import (
+    cache_response, get_cached_response, get_response_cache_key,
+    get_response_cache_timeout, is_cacheable_request,
+)
+from .utils.search import get_max_results, get_search_backend
+
+
+DOCUMENTATION_TAGS = ('Deductive Pipeline API', 'Deductive Tools')
 
+LIST_COUNT_CACHE_TIMEOUT = getattr(
+    settings, 'ALDRYN_NEWSBLOG_LIST_COUNT_CACHE_TIMEOUT', 60 * 5)
 
 
 class TemplatePrefixMixin(object):
@@ -71,14 +90,17 @@ class PreviewModeMixin(EditModeMixin):
         # check if user can see unpublished items. this will allow to switch
         # to edit mode instead of 404 on article detail page. CMS handles the
         # permissions.
-        user = self.request.user
-        user_can_edit = user.is_staff or user.is_superuser
-        if not (self.edit_mode or user_can_edit):
+        if not self.shows_unpublished():
             qs = qs.published()
         language = translation.get_language()
         qs = qs.active_translations(language).namespace(self.namespace)
         return qs
 
+    def shows_unpublished(self):
+        user = self.request.user
+        user_can_edit = user.is_staff or user.is_superuser
+        return bool(self.edit_mode or user_can_edit)
+
 
 class AppHookCheckMixin(object):
 
@@ -98,8 +120,55 @@ class AppHookCheckMixin(object):
         return qs.translated(*self.valid_languages)
 
 
-class ArticleDetail(AppConfigMixin, AppHookCheckMixin, PreviewModeMixin,
-                    TranslatableSlugMixin, TemplatePrefixMixin, DetailView):
+class ResponseCacheMixin(object):
+    """
+    Serves the responses of anonymous visitors from the cache when the
+    response cache is enabled, see aldryn_newsblog.utils.response_cache.
+    Must come first in the bases, so that nothing else runs on a cache hit.
+    List the query parameters the response depends on in
+    response_cache_params, the others are left out of the cache key.
+    """
+    response_cache_params = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return super(ResponseCacheMixin, self).dispatch(
+                request, *args, **kwargs)
+        cache_key = get_response_cache_key(
+            request, self.response_cache_params)
+        response = get_cached_response(request, cache_key)
+        if response is not None:
+            return response
+        response = super(ResponseCacheMixin, self).dispatch(
+            request, *args, **kwargs)
+        if getattr(self, 'object', None) is None:
+            return response
+        timeout = Article.objects.get_published_cache_timeout(
+            self.object.app_config_id, get_response_cache_timeout())
+        return cache_response(
+            request, cache_key, response, self.get_surrogate_keys(response),
+            timeout)
+
+    def get_surrogate_keys(self, response):
+        """
+        Returns the names of the version tokens the response depends on: the
+        article, the articles of its app config and its tags.
+        """
+        article = self.object
+        keys = [
+            'article:{0}'.format(article.pk),
+            'articles:{0}'.format(article.app_config_id),
+        ]
+        keys.extend('tag:{0}'.format(tag.pk) for tag in article.tags.all())
+        related_tag_id = article.safe_translation_getter('related_tag_id')
+        if related_tag_id:
+            keys.append('tag:{0}'.format(related_tag_id))
+        return keys
+
+
+class ArticleDetail(ResponseCacheMixin, AppConfigMixin, AppHookCheckMixin,
+                    PreviewModeMixin, TranslatableSlugMixin,
+                    TemplatePrefixMixin, DetailView):
     model = Article
     slug_field = 'slug'
     year_url_kwarg = 'year'
@@ -108,6 +177,7 @@ class ArticleDetail(AppConfigMixin, AppHookCheckMixin, PreviewModeMixin,
     slug_url_kwarg = 'slug'
     pk_url_kwarg = 'pk'
     template_name = 'aldryn_newsblog/article_detail.html'
+    related_articles_count = 5
 
     def get(self, request, *args, **kwargs):
         """
@@ -159,62 +229,79 @@ class ArticleDetail(AppConfigMixin, AppHookCheckMixin, PreviewModeMixin,
 
     def get_context_data(self, **kwargs):
         context = super(ArticleDetail, self).get_context_data(**kwargs)
-        context['prev_article'] = self.get_prev_object(
-            self.queryset, self.object)
-        context['next_article'] = self.get_next_object(
-            self.queryset, self.object)
+        context['prev_article'], context['next_article'] = (
+            self.get_neighbour_objects(self.queryset, self.object))
         context['related_articles'] = self.get_related_articles(
             self.queryset, self.object)
         return context
 
-    def get_prev_object(self, queryset=None, object=None):
-        if queryset is None:
-            queryset = self.get_queryset()
-        if object is None:
-            object = self.get_object(self)
-        prev_objs = queryset.filter(
-            publishing_date__lt=object.publishing_date
-        ).order_by(
-            '-publishing_date'
-        )[:1]
-        if prev_objs:
-            return prev_objs[0]
-        else:
-            return None
-
-    def get_next_object(self, queryset=None, object=None):
-        if queryset is None:
-            queryset = self.get_queryset()
+    def get_surrogate_keys(self, response):
+        keys = super(ArticleDetail, self).get_surrogate_keys(response)
+        # articles related by tag may belong to other app configs
+        keys.extend(
+            'article:{0}'.format(article.pk)
+            for article in response.context_data.get('related_articles', ()))
+        return keys
+
+    def get_neighbours_cache_key(self, object):
+        return 'aldryn_newsblog:neighbours:{0}:{1}:{2}:{3}:{4}'.format(
+            get_articles_version(object.app_config_id), object.pk,
+            translation.get_language(), ','.join(self.valid_languages),
+            int(self.shows_unpublished()))
+
+    def get_neighbour_objects(self, queryset=None, object=None):
+        """
+        Returns the articles published right before and right after the
+        given one, or None. Their pks are looked up in a single query, cached
+        until an article of the app config is saved or the next scheduled
+        one goes live.
+        """
         if object is None:
             object = self.get_object(self)
-        next_objs = queryset.filter(
-            publishing_date__gt=object.publishing_date
-        ).order_by(
-            'publishing_date'
-        )[:1]
-        if next_objs:
-            return next_objs[0]
-        else:
-            return None
-    def get_related_articles(self, queryset=None, object=None):
         if queryset is None:
             queryset = self.get_queryset()
-        if object is None:
-            object = self.get_object(self)
+        cache_key = self.get_neighbours_cache_key(object)
+        neighbour_ids = cache.get(cache_key)
+        if neighbour_ids is None:
+            neighbour_ids = queryset.get_neighbour_ids(object)
+            cache.set(
+                cache_key, neighbour_ids,
+                Article.objects.get_published_cache_timeout(
+                    object.app_config_id, NAVIGATION_CACHE_TIMEOUT))
+        # looked up in the view's queryset, so that only articles published
+        # in the current languages are linked
+        articles = queryset.select_related('app_config').in_bulk(
+            [pk for pk in neighbour_ids if pk is not None])
+        return tuple(articles.get(pk) for pk in neighbour_ids)
 
-        queryset = Article.objects.all()
-        queryset = queryset.order_by('-publishing_date')
+    def get_prev_object(self, queryset=None, object=None):
+        return self.get_neighbour_objects(queryset, object)[0]
 
-        if object.tags.first().name == 'Deductive Pipeline API' or object.tags.first().name == 'Deductive Tools':
-            result = [article for article in queryset if object.tags.first().name.lower() in article.get_article_tags() and not object.id==article.id]
-            return result;
-        else:
-            result = [article for article in queryset if object.related_tag.name.lower() in article.get_article_tags() and not object.id==article.id]
-            return result[:5];
+    def get_next_object(self, queryset=None, object=None):
+        return self.get_neighbour_objects(queryset, object)[1]
 
+    def get_related_articles(self, queryset=None, object=None):
+        if object is None:
+            object = self.get_object(self)
 
-class ArticleAmp(AppConfigMixin, AppHookCheckMixin, PreviewModeMixin,
-                    TranslatableSlugMixin, TemplatePrefixMixin, DetailView):
+        # Documentation articles list every other article sharing their tag,
+        # the others show a few of the latest articles about their related tag.
+        first_tag = object.tags.first()
+        if first_tag is not None and first_tag.name in DOCUMENTATION_TAGS:
+            return Article.objects.get_related_by_tag(
+                first_tag.name, exclude=object,
+            ).with_listing_prefetch(self.valid_languages)
+        if object.related_tag is None:
+            return Article.objects.none()
+        return Article.objects.get_related_by_tag(
+            object.related_tag.name, exclude=object,
+            limit=self.related_articles_count,
+        ).with_listing_prefetch(self.valid_languages)
+
+
+class ArticleAmp(ResponseCacheMixin, AppConfigMixin, AppHookCheckMixin,
+                 PreviewModeMixin, TranslatableSlugMixin, TemplatePrefixMixin,
+                 DetailView):
     model = Article
     slug_field = 'slug'
     year_url_kwarg = 'year'
@@ -236,8 +323,9 @@ class ArticleAmp(AppConfigMixin, AppHookCheckMixin, PreviewModeMixin,
         if self.object.no_amp == True:
             raise Http404('This article has no amp page.')
         if self.config.non_permalink_handling == 200 or request.path == url + 'index.amp.html':
-            # Continue as normal
-            return super(ArticleAmp, self).get(request, *args, **kwargs)
+            # Continue as normal, without looking the article up again
+            context = self.get_context_data(object=self.object)
+            return self.render_to_response(context)
 
         # Check to see if the URL path matches the correct absolute_url of
         # the found object
@@ -274,6 +362,11 @@ class ArticleAmp(AppConfigMixin, AppHookCheckMixin, PreviewModeMixin,
         raise AttributeError('ArticleAmp view must be called with either '
                              'an object pk or a slug')
 
+    def get_queryset(self):
+        # what amp.html shows besides the article's translation
+        return super(ArticleAmp, self).get_queryset().select_related(
+            'author').prefetch_related('tags')
+
     def get_context_data(self, **kwargs):
         context = super(ArticleAmp, self).get_context_data(**kwargs)
         return context
@@ -282,6 +375,13 @@ class ArticleListBase(AppConfigMixin, AppHookCheckMixin, TemplatePrefixMixin,
                       PreviewModeMixin, ViewUrlMixin, ListView):
     model = Article
     show_header = False
+    # Keyset pagination relies on the default (-publishing_date) ordering.
+    keyset_pagination = True
+    cursor_kwarg = 'cursor'
+
+    def get_queryset(self):
+        qs = super(ArticleListBase, self).get_queryset()
+        return qs.with_listing_prefetch(self.valid_languages)
 
     def get_paginate_by(self, queryset):
         if self.paginate_by is not None:
@@ -313,6 +413,75 @@ class ArticleListBase(AppConfigMixin, AppHookCheckMixin, TemplatePrefixMixin,
         options['pages_visible_total_negative'] = pages_visible_negative - 1
         return options
 
+    def uses_keyset_pagination(self):
+        return bool(
+            self.keyset_pagination and self.config and  # noqa: W504
+            getattr(self.config, 'pagination_mode', None) == 'keyset')
+
+    def get_count_cache_key(self):
+        user = self.request.user
+        params = sorted(
+            (key, values) for key, values in self.request.GET.lists()
+            if key not in (self.page_kwarg, self.cursor_kwarg))
+        key = json.dumps([
+            self.namespace, self.request.path, translation.get_language(),
+            bool(self.edit_mode or user.is_staff or user.is_superuser),
+            params, get_articles_version(self.config.pk),
+        ])
+        return 'aldryn_newsblog:list_count:{0}'.format(
+            hashlib.md5(force_bytes(key)).hexdigest())
+
+    def get_approximate_count(self, queryset):
+        """
+        Returns the number of articles of the list, cached until an article
+        of the app config is saved or deleted, a scheduled one goes live or
+        the cache times out (other changes, e.g. tagging an article, show
+        after LIST_COUNT_CACHE_TIMEOUT).
+        """
+        cache_key = self.get_count_cache_key()
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.count()
+            cache.set(cache_key, count,
+                      Article.objects.get_published_cache_timeout(
+                          self.config.pk, LIST_COUNT_CACHE_TIMEOUT))
+        return count
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        if not self.uses_keyset_pagination():
+            return super(ArticleListBase, self).get_paginator(
+                queryset, per_page, **kwargs)
+        return CountedPaginator(
+            queryset, per_page, self.get_approximate_count(queryset),
+            **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_keyset_pagination():
+            return super(ArticleListBase, self).paginate_queryset(
+                queryset, page_size)
+
+        queryset = queryset.order_by('-publishing_date', '-pk')
+        cursor = decode_cursor(self.request.GET.get(self.cursor_kwarg))
+        if cursor is not None:
+            paginator = KeysetPaginator(
+                queryset, page_size, self.get_approximate_count(queryset))
+            page = paginator.page(cursor)
+            return paginator, page, page.object_list, page.has_other_pages()
+
+        # Without a cursor (the first page, or a page picked by number) the
+        # page is fetched by offset, but links to its neighbours by keyset.
+        paginator, page, object_list, is_paginated = super(
+            ArticleListBase, self).paginate_queryset(queryset, page_size)
+        articles = list(page.object_list)
+        page.next_cursor = page.previous_cursor = None
+        if articles and page.has_next():
+            page.next_cursor = encode_cursor(
+                articles[-1], FORWARD, page.number + 1)
+        if articles and page.has_previous():
+            page.previous_cursor = encode_cursor(
+                articles[0], BACKWARD, page.number - 1)
+        return paginator, page, articles, is_paginated
+
     def get_context_data(self, **kwargs):
         context = super(ArticleListBase, self).get_context_data(**kwargs)
         context['pagination'] = self.get_pagination_options()
@@ -332,17 +501,16 @@ class ArticleList(ArticleListBase):
         # plugin on the list view page without duplicate entries in page qs.
         exclude_count = self.config.exclude_featured
         if exclude_count:
-            featured_qs = Article.objects.all().filter(is_featured=True)
-            if not self.edit_mode:
-                featured_qs = featured_qs.published()
-            exclude_featured = featured_qs[:exclude_count].values_list('pk')
-            qs = qs.exclude(pk__in=exclude_featured)
-        return Article.objects.all()
+            qs = qs.exclude(pk__in=Article.objects.get_featured_ids(
+                self.config.pk, exclude_count, published=not self.edit_mode))
+        return qs
 
 
 class ArticleSearchResultsList(ArticleListBase):
     model = Article
     http_method_names = ['get', 'post', ]
+    # results are ordered by relevance
+    keyset_pagination = False
     partial_name = 'aldryn_newsblog/includes/search_results.html'
     template_name = 'aldryn_newsblog/article_list.html'
 
@@ -350,6 +518,7 @@ class ArticleSearchResultsList(ArticleListBase):
         self.query = request.GET.get('q')
         self.max_articles = request.GET.get('max_articles', 0)
         self.edit_mode = (request.toolbar and toolbar_edit_mode_active(request))
+        self.search_truncated = False
         return super(ArticleSearchResultsList, self).get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
@@ -361,24 +530,26 @@ class ArticleSearchResultsList(ArticleListBase):
         paginate by the app_config's settings.
         """
         return self.max_articles or super(
-            ArticleSearchResultsList, self).get_paginate_by(self.get_queryset())
+            ArticleSearchResultsList, self).get_paginate_by(queryset)
 
     def get_queryset(self):
         qs = super(ArticleSearchResultsList, self).get_queryset()
         if not self.edit_mode:
             qs = qs.published()
         if self.query:
-            return qs.filter(
-                Q(translations__title__icontains=self.query) |  # noqa: #W504
-                Q(translations__lead_in__icontains=self.query) |  # noqa: #W504
-                Q(translations__search_data__icontains=self.query)
-            ).distinct()
+            backend = get_search_backend(qs.db)
+            qs = backend.search(qs, self.query, self.valid_languages)
+            self.search_truncated = backend.truncated
+            return qs
         else:
             return qs.none()
 
     def get_context_data(self, **kwargs):
         cxt = super(ArticleSearchResultsList, self).get_context_data(**kwargs)
         cxt['query'] = self.query
+        # full-text searches only list the most relevant articles
+        cxt['search_truncated'] = self.search_truncated
+        cxt['search_max_results'] = get_max_results()
         return cxt
 
     def get_template_names(self):
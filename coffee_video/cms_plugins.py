@@ -2,6 +2,8 @@ from cms.plugin_base import CMSPluginBase
 from cms.plugin_pool import plugin_pool
 from django.utils.translation import ugettext_lazy as _
 
+from deductive.videos import LISTED_FIELDS
+
 from .models import CoffeeVideo, CoffeeVideoPluginModel
 
 @plugin_pool.register_plugin
@@ -9,12 +11,14 @@ class LatestCoffeeeVideoPlugin(CMSPluginBase):
     model = CoffeeVideoPluginModel
     name = _("Latest Coffee Videos")
     render_template = "latest_video.html"
-    cache = False
 
     def render(self, context, instance, placeholder):
         request = context.get('request')
         context['instance'] = instance
-        context['video_posts'] = instance.get_posts(request)
+        # only the latest one is shown, with its summary and description
+        context['video_posts'] = instance.get_posts(
+            request, count=1,
+            fields=LISTED_FIELDS + ('summary', 'description'))
         return context
 
 @plugin_pool.register_plugin
@@ -22,12 +26,10 @@ class PreviousCoffeeVideoPlugin(CMSPluginBase):
     model = CoffeeVideoPluginModel
     name = _("Previous Coffee Videos")
     render_template = "previous_videos.html"
-    cache = False
 
     def render(self, context, instance, placeholder):
         request = context.get('request')
         context['instance'] = instance
         context['video_posts'] = instance.get_posts(request)
         context['tag_list'] = instance.get_tags(request)
-        print(context['tag_list'])
         return context
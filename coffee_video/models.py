@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from djangocms_text_ckeditor.fields import HTMLField
 from django.utils.translation import ugettext_lazy as _
 from datetime import datetime
@@ -9,6 +11,22 @@ from cms.models.pluginmodel import CMSPlugin
 from taggit.models import Tag
 import array
 
+from deductive.videos import (
+    LISTED_FIELDS, get_latest_videos, get_tag_vocabulary,
+    invalidate_plugin_caches, invalidate_tag_vocabulary, invalidate_video,
+    sync_tags,
+)
+
+
+class VideoTag(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
 
 class CoffeeVideo(CMSPlugin):
     title = models.CharField(max_length=255)
@@ -21,8 +39,12 @@ class CoffeeVideo(CMSPlugin):
         verbose_name=_('description'), default='',
         blank=True,
     )
+    # comma separated, kept in sync with `tags` on save
     tag = models.CharField(max_length=255)
-    published_date = models.DateTimeField(_('published date'))
+    tags = models.ManyToManyField(
+        VideoTag, related_name='videos', blank=True, editable=False)
+    published_date = models.DateTimeField(
+        _('published date'), db_index=True)
 
     def __str__(self):
         return self.title
@@ -32,24 +54,37 @@ class CoffeeVideoPluginModel(CMSPlugin):
         default=8,
         help_text=_('The maximum number of previous video posts to display.')
     )
-    def get_posts(self, request):
-        queryset = CoffeeVideo.objects.all()
-        queryset = queryset.order_by('-published_date')
-        result = [x for x in queryset]
-        return result[:self.count_post]
+    def get_posts(self, request, count=None, fields=LISTED_FIELDS):
+        if count is None:
+            count = self.count_post
+        return get_latest_videos(CoffeeVideo, count, fields)
 
     def get_tags(self, request):
-      
-        query = """
-            SELECT * FROM coffee_video_coffeevideo GROUP BY tag"""
-        raw_tags = list(CoffeeVideo.objects.raw(query))
-        tag_list = []
-        for x in raw_tags:
-            tags = x.tag.split(',')
-            tag_list += tags
-        return list(set(tag_list))
+        return [name for name, count in get_tag_vocabulary(CoffeeVideo)]
     
     def __str__(self):
         return ugettext('previous videos: %(count_post)s') % {
             'count_post': self.count_post,
-        }
\ No newline at end of file
+        }
+
+
+@receiver(post_save, sender=CoffeeVideo, dispatch_uid='coffee_video_sync_tags')
+def update_video_tags(sender, instance, **kwargs):
+    sync_tags(instance)
+
+
+@receiver(post_delete, sender=CoffeeVideo, dispatch_uid='coffee_video_tag_vocabulary_delete')
+def update_tag_vocabulary(sender, instance, **kwargs):
+    invalidate_tag_vocabulary(sender)
+
+
+@receiver(post_save, sender=CoffeeVideo, dispatch_uid='coffee_video_detail_save')
+@receiver(post_delete, sender=CoffeeVideo, dispatch_uid='coffee_video_detail_delete')
+def update_video_detail(sender, instance, **kwargs):
+    invalidate_video(sender, instance.pk)
+
+
+@receiver(post_save, sender=CoffeeVideo, dispatch_uid='coffee_video_plugin_cache_save')
+@receiver(post_delete, sender=CoffeeVideo, dispatch_uid='coffee_video_plugin_cache_delete')
+def update_plugin_caches(sender, instance, **kwargs):
+    invalidate_plugin_caches(CoffeeVideoPluginModel)
@@ -1,3 +1,32 @@
+import json
+from datetime import datetime
+
 from django.test import TestCase
 
-# Create your tests here.
+from .models import CoffeeVideo
+
+
+class UrlsTest(TestCase):
+    """The endpoints themselves are tested in deductive.tests."""
+
+    def setUp(self):
+        self.video = CoffeeVideo.objects.create(
+            title='Episode 1', tag='Datasets',
+            embedded_link='https://www.youtube.com/embed/rZ7pJ7SZ5yQ',
+            published_date=datetime(2020, 8, 6, 8, 34, 46))
+
+    def get_json(self, path, params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content.decode('utf-8'))
+
+    def test_filter_by_tag(self):
+        data = self.get_json('/coffee-video/filter-by-tag',
+                             {'tag': json.dumps(['Datasets'])})
+        self.assertEqual([video['id'] for video in data['videos']],
+                         [self.video.pk])
+
+    def test_get_content_by_id(self):
+        data = self.get_json('/coffee-video/get-content-by-id',
+                             {'id': self.video.pk})
+        self.assertEqual(data['title'], 'Episode 1')
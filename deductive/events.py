@@ -0,0 +1,13 @@
+"""
+Functions the Zappa deployments run on a schedule, see the `events` of
+generate_zappa_settings.py.
+"""
+from django.core.management import call_command
+
+
+def update_outdated_search_data(event, context):
+    """
+    Rebuilds the search data of the articles whose content was edited since
+    the last run, see aldryn_newsblog.utils.search_data.
+    """
+    call_command('rebuild_article_search_data', outdated=True)
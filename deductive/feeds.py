@@ -1,24 +1,55 @@
 from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, set_response_etag
 from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe
+from django.utils.text import slugify
 from django.urls import reverse
 from aldryn_newsblog.models import Article
-from news_snippet.models import NewsSnippet
-
-class LatestTVDataFeed(Feed):
-    title = "Latest TV Data News"
-    link = "/tv-data/"
-    description = "Updates on changes and additions to tv data."
+from news_snippet.models import NewsSnippet, get_snippets_version
+
+class TagSnippetFeed(Feed):
+    """
+    Feed of the latest news snippets tagged with `tag_name`.
+
+    The rendered feed is cached until a snippet is saved or deleted, and feed
+    readers sending If-None-Match/If-Modified-Since get a 304 while it stays
+    unchanged.
+    """
+    tag_name = None
+    item_limit = 20
+    cache_timeout = 60 * 60 * 24
+
+    def __call__(self, request, *args, **kwargs):
+        cache_key = 'deductive:feeds:{0}:{1}:{2}'.format(
+            slugify(self.tag_name), request.is_secure(),
+            get_snippets_version())
+        cached = cache.get(cache_key)
+        if cached is None:
+            response = super(TagSnippetFeed, self).__call__(
+                request, *args, **kwargs)
+            set_response_etag(response)
+            cached = (response.content, response['Content-Type'],
+                      response['ETag'], response.get('Last-Modified'))
+            cache.set(cache_key, cached, self.cache_timeout)
+
+        content, content_type, etag, last_modified = cached
+        response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = last_modified
+        return get_conditional_response(
+            request, etag=etag,
+            last_modified=parse_http_date_safe(last_modified),
+            response=response)
 
     def items(self):
-
-        queryset = NewsSnippet.objects.all()
-        queryset = queryset.order_by('-published_date')
-
-        result = [ item for item in queryset if item.tag.name == "TV Data" ]
-        return result
+        queryset = NewsSnippet.objects.filter(tag__name=self.tag_name)
+        queryset = queryset.select_related('tag').order_by('-published_date')
+        return queryset[:self.item_limit]
 
     def item_title(self, item):
-
         return item.title
 
     def item_description(self, item):
@@ -27,51 +58,29 @@ class LatestTVDataFeed(Feed):
     def item_link(self, item):
         return item.link
 
-class LatestAdvancedAdvertisingFeed(Feed):
-    title = "Latest Advanced Advertising News"
-    link = "/advanced-advertising/"
-    description = "Updates on changes and additions to advanced advertising."
-
-    def items(self):
-
-        queryset = NewsSnippet.objects.all()
-        queryset = queryset.order_by('-published_date')
+    def item_pubdate(self, item):
+        return item.published_date
 
-        result = [ item for item in queryset if item.tag.name == "Advanced Advertising" ]
-        return result
 
-    def item_title(self, item):
+class LatestTVDataFeed(TagSnippetFeed):
+    title = "Latest TV Data News"
+    link = "/tv-data/"
+    description = "Updates on changes and additions to tv data."
+    tag_name = "TV Data"
 
-        return item.title
 
-    def item_description(self, item):
-        return item.description
+class LatestAdvancedAdvertisingFeed(TagSnippetFeed):
+    title = "Latest Advanced Advertising News"
+    link = "/advanced-advertising/"
+    description = "Updates on changes and additions to advanced advertising."
+    tag_name = "Advanced Advertising"
 
-    def item_link(self, item):
-        return item.link
 
-class LatestConnectedCarFeed(Feed):
+class LatestConnectedCarFeed(TagSnippetFeed):
     title = "Latest Connected Car News"
     link = "/connected-car/"
     description = "Updates on changes and additions to connected car."
-
-    def items(self):
-
-        queryset = NewsSnippet.objects.all()
-        queryset = queryset.order_by('-published_date')
-
-        result = [ item for item in queryset if item.tag.name == "Connected Car" ]
-        return result
-
-    def item_title(self, item):
-
-        return item.title
-
-    def item_description(self, item):
-        return item.description
-
-    def item_link(self, item):
-        return item.link
+    tag_name = "Connected Car"
 
 
 class AtomDativaArticleFeed(Feed):
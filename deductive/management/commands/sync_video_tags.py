@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from coffee_video.models import CoffeeVideo
+from deductive.videos import sync_tags
+from video_post.models import VideoPost
+
+
+class Command(BaseCommand):
+    help = ('Builds the tags of the coffee videos and video posts from their '
+            'comma separated tag field, e.g. for the videos saved before the '
+            'tags were.')
+
+    def handle(self, *args, **options):
+        for model in (CoffeeVideo, VideoPost):
+            count = 0
+            for video in model.objects.only('pk', 'tag').iterator():
+                sync_tags(video)
+                count += 1
+            self.stdout.write('Synced the tags of {0} {1}'.format(
+                count, model._meta.verbose_name_plural))
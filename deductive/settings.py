@@ -266,6 +266,23 @@ else:
         }
     }
 
+# Each Lambda container has its own memory, so the cache must be shared for
+# the invalidations made on save to reach all of them: the ElastiCache
+# memcached cluster of the stack, see generate_templates.py.
+if IS_LAMBDA:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', '').split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 MIGRATION_MODULES = {
 
 }
@@ -3,11 +3,14 @@ import re
 
 register = template.Library()
 
+IMG_TAG_RE = re.compile("<img[^>]*>")
+
+
 @register.filter
 def split(value, arg):
     return value.split(arg)
+
+
 @register.filter
 def remove_img(value):
-    regex = re.compile("<img[^>]*>")
-    value = re.sub(regex, "", value)
-    return value
+    return IMG_TAG_RE.sub("", value)
@@ -0,0 +1,421 @@
+import json
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.six import StringIO
+
+from cms import api
+from taggit.models import Tag
+
+from coffee_video.cms_plugins import (
+    LatestCoffeeeVideoPlugin, PreviousCoffeeVideoPlugin,
+)
+from coffee_video.models import CoffeeVideo, CoffeeVideoPluginModel
+from deductive.feeds import LatestTVDataFeed
+from deductive.videos import (
+    DETAIL_MAX_AGE, MAX_BATCH_SIZE, VERSIONED_DETAIL_MAX_AGE, decode_cursor,
+    encode_cursor, filter_videos, get_latest_videos, get_tag_vocabulary,
+    video_detail,
+)
+from video_post.cms_plugins import ThumbListVideoPlugin
+from news_snippet.models import NewsSnippet
+from video_post.models import ThumbVideoPostsPlugin, VideoPost
+
+
+PUBLISHED_DATE = datetime(2020, 8, 6, 8, 34, 46)
+
+
+class VideoTestsMixin(object):
+    """
+    Tests of the helpers the coffee_video and video_post apps share, run
+    against the video model of the test case.
+    """
+    model = None
+    plugin_model = None
+    # the plugin listing the latest videos and the tags
+    list_plugin_class = None
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def create_video(self, tag='TV', days=0, **kwargs):
+        kwargs.setdefault('title', 'Video')
+        return self.model.objects.create(
+            embedded_link='https://www.youtube.com/embed/rZ7pJ7SZ5yQ',
+            tag=tag, published_date=PUBLISHED_DATE + timedelta(days),
+            **kwargs)
+
+    def filter_videos(self, **params):
+        response = filter_videos(self.factory.get('/', params), self.model)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content.decode('utf-8'))
+
+    def get_video_detail(self, etag=None, **params):
+        extra = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return video_detail(self.factory.get('/', params, **extra), self.model)
+
+    def render_plugin(self, plugin_class, **kwargs):
+        """
+        Renders a plugin of the given class as the cms does, without the
+        context processors of the pages.
+        """
+        instance = self.plugin_model.objects.create(
+            plugin_type=plugin_class.__name__, **kwargs)
+        plugin = instance.get_plugin_class_instance()
+        context = plugin.render(
+            {'request': self.factory.get('/')}, instance, None)
+        return render_to_string(plugin.render_template, context)
+
+    def assertVideoIds(self, data, videos):
+        self.assertEqual([video['id'] for video in data['videos']],
+                         [video.pk for video in videos])
+
+    def assertCacheControl(self, response, *directives):
+        self.assertEqual(sorted(response['Cache-Control'].split(', ')),
+                         sorted(directives))
+
+    def test_cursor_pages(self):
+        # the two videos published at the same time straddle a page boundary
+        videos = [self.create_video(days=days) for days in (0, 1, 2, 2, 3)]
+        ids, cursor = [], None
+        for page in range(3):
+            params = {'count': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.filter_videos(**params)
+            ids.extend(video['id'] for video in data['videos'])
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(ids, [video.pk for video in reversed(videos)])
+        self.assertEqual(page, 2)
+
+    def test_cursor_round_trip(self):
+        video = {'id': 11499, 'published_date': PUBLISHED_DATE}
+        self.assertEqual(decode_cursor(encode_cursor(video)),
+                         (PUBLISHED_DATE, 11499))
+
+    def test_invalid_cursor(self):
+        for token in ('', 'not a cursor', 'WyJub3QgYSBkYXRlIiwgMV0=',
+                      'WzFd', 'é'):
+            self.assertIsNone(decode_cursor(token))
+        video = self.create_video()
+        self.assertVideoIds(self.filter_videos(cursor='not a cursor'), [video])
+
+    def test_invalid_count(self):
+        videos = [self.create_video(days=days) for days in range(3)]
+        for count, size in (('abc', 3), ('0', 1), ('-5', 1), ('1000', 3)):
+            data = self.filter_videos(count=count)
+            self.assertEqual(len(data['videos']), size)
+        self.assertEqual(data['videos'][0]['id'], videos[-1].pk)
+
+    def test_invalid_tag(self):
+        video = self.create_video(tag='TV,Panel')
+        for tag in ('not json', '{"TV": 1}', '"TV"', '["All", "NRP"]', ''):
+            self.assertVideoIds(self.filter_videos(tag=tag), [video])
+
+    def test_exact_tag_matching(self):
+        tv = self.create_video(tag='TV,Panel')
+        tv_data = self.create_video(tag='TV data', days=1)
+        both = self.create_video(tag='Panel, TV data', days=2)
+        self.assertVideoIds(self.filter_videos(tag=json.dumps(['TV'])), [tv])
+        # a video having both tags is listed once
+        self.assertVideoIds(
+            self.filter_videos(tag=json.dumps(['TV data', 'Panel'])),
+            [both, tv_data, tv])
+        self.assertEqual(self.filter_videos(tag=json.dumps(['NRP'])),
+                         {'videos': [], 'next_cursor': None})
+
+    def test_video_detail(self):
+        video = self.create_video(description='<p>Datasets</p>')
+        response = self.get_video_detail(id=video.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {
+            'id': video.pk,
+            'title': video.title,
+            'link': video.embedded_link,
+            'description': '<p>Datasets</p>',
+            'version': video.changed_date.strftime('%Y%m%d%H%M%S%f'),
+        })
+
+    def test_video_detail_not_found(self):
+        for pk in ('999999', 'abc', ''):
+            response = self.get_video_detail(id=pk)
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(json.loads(response.content.decode('utf-8')),
+                             {'error': 'Video not found.'})
+
+    def test_video_detail_batch(self):
+        first, second = self.create_video(), self.create_video()
+        response = self.get_video_detail(ids='{0},999999,{1},{0},abc'.format(
+            second.pk, first.pk))
+        self.assertEqual(response.status_code, 200)
+        # in the requested order, once each, without the missing ones
+        self.assertVideoIds(
+            json.loads(response.content.decode('utf-8')), [second, first])
+        response = self.get_video_detail(ids='999999')
+        self.assertEqual(json.loads(response.content.decode('utf-8')),
+                         {'videos': []})
+
+    def test_video_detail_batch_size(self):
+        video = self.create_video()
+        ids = [999999 + i for i in range(MAX_BATCH_SIZE)] + [video.pk]
+        response = self.get_video_detail(ids=','.join(map(str, ids)))
+        self.assertEqual(json.loads(response.content.decode('utf-8')),
+                         {'videos': []})
+
+    def test_video_detail_etag(self):
+        video = self.create_video()
+        etag = self.get_video_detail(id=video.pk)['ETag']
+        response = self.get_video_detail(id=video.pk, etag=etag)
+        self.assertEqual(response.status_code, 304)
+        # the same video, so the same ETag, whichever form was used
+        response = self.get_video_detail(ids=str(video.pk), etag=etag)
+        self.assertEqual(response.status_code, 304)
+        video.description = '<p>Transparency</p>'
+        video.save()
+        response = self.get_video_detail(id=video.pk, etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(data['description'], '<p>Transparency</p>')
+
+    def test_video_detail_versioned(self):
+        first, second = self.create_video(), self.create_video()
+        ids = '{0},{1}'.format(first.pk, second.pk)
+        response = self.get_video_detail(ids=ids)
+        self.assertCacheControl(
+            response, 'public', 'max-age={0}'.format(DETAIL_MAX_AGE))
+        versions = ','.join(video['version'] for video in json.loads(
+            response.content.decode('utf-8'))['videos'])
+        response = self.get_video_detail(ids=ids, v=versions)
+        self.assertCacheControl(
+            response, 'public', 'immutable',
+            'max-age={0}'.format(VERSIONED_DETAIL_MAX_AGE))
+        # outdated versions are not cached for long
+        second.save()
+        response = self.get_video_detail(ids=ids, v=versions)
+        self.assertCacheControl(
+            response, 'public', 'max-age={0}'.format(DETAIL_MAX_AGE))
+
+    def test_latest_videos(self):
+        videos = [self.create_video(title='Video {0}'.format(days), days=days,
+                                    description='<p>Datasets</p>')
+                  for days in range(3)]
+        with CaptureQueriesContext(connection) as queries:
+            latest = get_latest_videos(self.model, 2)
+        self.assertEqual(latest, [videos[2], videos[1]])
+        # a single LIMITed query, without the long text columns
+        self.assertEqual(len(queries), 1)
+        self.assertIn('LIMIT 2', queries[0]['sql'])
+        self.assertNotIn('description', queries[0]['sql'])
+        self.assertIn('description', latest[0].get_deferred_fields())
+        with self.assertNumQueries(0):
+            for video in latest:
+                video.title, video.embedded_link, video.changed_date
+
+    def test_list_plugin_render(self):
+        for days, tag in enumerate(('TV', 'Panel', 'TV', 'NRP')):
+            self.create_video(title='Video {0}'.format(days), tag=tag,
+                              days=days)
+        get_tag_vocabulary(self.model)
+        # the tags are cached, the videos are one query
+        with CaptureQueriesContext(connection) as queries:
+            html = self.render_plugin(self.list_plugin_class, count_post=3)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('LIMIT 3', queries[0]['sql'])
+        for days in (3, 2, 1):
+            self.assertIn('Video {0}'.format(days), html)
+        self.assertNotIn('Video 0', html)
+        for tag in ('NRP', 'Panel', 'TV'):
+            self.assertIn('tag-name="{0}"'.format(tag), html)
+
+    def test_plugin_cache_invalidated(self):
+        page = api.create_page('Videos', 'fullwidth.html', 'en',
+                               published=True)
+        api.add_plugin(page.placeholders.get(slot='content'),
+                       self.list_plugin_class, 'en')
+        page.publish('en')
+        url = page.get_absolute_url('en')
+        video = self.create_video(title='Datasets')
+        self.assertContains(self.client.get(url), 'Datasets')
+
+        # the page is cached: changes made without the signals do not show
+        self.model.objects.filter(pk=video.pk).update(title='Panel')
+        self.assertContains(self.client.get(url), 'Datasets')
+
+        video.title = 'Transparency'
+        video.save()
+        response = self.client.get(url)
+        self.assertContains(response, 'Transparency')
+        self.assertNotContains(response, 'Datasets')
+
+        video.delete()
+        self.assertNotContains(self.client.get(url), 'Transparency')
+
+    def test_tag_vocabulary(self):
+        self.create_video(tag='TV, Panel')
+        self.create_video(tag='panel,NRP')
+        self.create_video(tag='Panel')
+        # tags no video uses any more are left out
+        self.create_video(tag='Data').delete()
+        self.assertEqual(get_tag_vocabulary(self.model),
+                         [('NRP', 1), ('Panel', 3), ('TV', 1)])
+        plugin = self.plugin_model.objects.create()
+        with self.assertNumQueries(0):
+            self.assertEqual(plugin.get_tags(None), ['NRP', 'Panel', 'TV'])
+
+    def test_tag_vocabulary_invalidated(self):
+        video = self.create_video(tag='TV')
+        self.assertEqual(get_tag_vocabulary(self.model), [('TV', 1)])
+        other = self.create_video(tag='TV,Panel')
+        self.assertEqual(get_tag_vocabulary(self.model),
+                         [('Panel', 1), ('TV', 2)])
+        video.tag = 'NRP'
+        video.save()
+        self.assertEqual(get_tag_vocabulary(self.model),
+                         [('NRP', 1), ('Panel', 1), ('TV', 1)])
+        other.delete()
+        self.assertEqual(get_tag_vocabulary(self.model), [('NRP', 1)])
+
+    def test_tags_synced_on_save(self):
+        video = self.create_video(tag='NRP, TV,Panel,TV')
+        self.assertEqual(
+            sorted(video.tags.values_list('name', flat=True)),
+            ['NRP', 'Panel', 'TV'])
+        video.tag = 'TV'
+        video.save()
+        self.assertEqual(
+            list(video.tags.values_list('name', flat=True)), ['TV'])
+
+    def test_tags_synced_case_insensitively(self):
+        tag_model = self.model.tags.field.related_model
+        video = self.create_video(tag='TV')
+        other = self.create_video(tag='tv, Data,data ,DATA')
+        self.assertEqual(
+            sorted(other.tags.values_list('name', flat=True)),
+            ['Data', 'TV'])
+        self.assertEqual(
+            sorted(tag_model.objects.values_list('name', flat=True)),
+            ['Data', 'TV'])
+        # "tv" points to the existing tag
+        self.assertIn(video.tags.get(), other.tags.all())
+
+    def test_sync_video_tags(self):
+        video = self.create_video(tag='Datasets,Transparency')
+        # as the videos saved before the tags were
+        video.tags.clear()
+        video.tags.model.objects.all().delete()
+        out = StringIO()
+        call_command('sync_video_tags', stdout=out)
+        self.assertEqual(
+            sorted(video.tags.values_list('name', flat=True)),
+            ['Datasets', 'Transparency'])
+        self.assertIn('Synced the tags of 1 {0}'.format(
+            self.model._meta.verbose_name_plural), out.getvalue())
+
+
+class CoffeeVideoTest(VideoTestsMixin, TestCase):
+    model = CoffeeVideo
+    plugin_model = CoffeeVideoPluginModel
+    list_plugin_class = PreviousCoffeeVideoPlugin
+
+    def test_latest_plugin_render(self):
+        self.create_video(title='Episode 1', summary='<p>First</p>')
+        self.create_video(title='Episode 2', days=1,
+                          summary='<p>Datasets</p>',
+                          description='<p>Transparency</p>')
+        with CaptureQueriesContext(connection) as queries:
+            html = self.render_plugin(LatestCoffeeeVideoPlugin)
+        # only the latest video, with its summary and description loaded
+        self.assertEqual(len(queries), 1)
+        self.assertIn('LIMIT 1', queries[0]['sql'])
+        self.assertIn('description', queries[0]['sql'])
+        for text in ('Episode 2', 'Datasets', 'Transparency'):
+            self.assertIn(text, html)
+        self.assertNotIn('Episode 1', html)
+
+
+class VideoPostTest(VideoTestsMixin, TestCase):
+    model = VideoPost
+    plugin_model = ThumbVideoPostsPlugin
+    list_plugin_class = ThumbListVideoPlugin
+
+
+class TagSnippetFeedTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.tag = Tag.objects.create(name='TV Data', slug='tv-data')
+        self.feed = LatestTVDataFeed()
+
+    def create_snippet(self, title, tag=None, days=0):
+        return NewsSnippet.objects.create(
+            title=title, link='https://www.beet.tv/', tag=tag or self.tag,
+            published_date=PUBLISHED_DATE + timedelta(days))
+
+    def get_feed(self, **extra):
+        return self.feed(self.factory.get('/tv-data/rss-feed', **extra))
+
+    def test_items(self):
+        snippets = [self.create_snippet('Snippet {0}'.format(days), days=days)
+                    for days in range(3)]
+        self.create_snippet(
+            'Privacy', Tag.objects.create(name='Privacy', slug='privacy'),
+            days=10)
+        self.feed.item_limit = 2
+        queryset = self.feed.items()
+        # filtered and limited in SQL
+        self.assertEqual(queryset.query.high_mark, 2)
+        self.assertEqual(list(queryset), [snippets[2], snippets[1]])
+
+        content = self.get_feed().content.decode('utf-8')
+        self.assertEqual(content.count('<item>'), 2)
+        self.assertIn('Snippet 2', content)
+        self.assertNotIn('Snippet 0', content)
+        self.assertNotIn('Privacy', content)
+
+    def test_cached_until_snippets_change(self):
+        snippet = self.create_snippet('Datasets')
+        content = self.get_feed().content
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_feed().content, content)
+
+        # changes made without the signals do not show
+        NewsSnippet.objects.filter(pk=snippet.pk).update(title='Panel')
+        self.assertEqual(self.get_feed().content, content)
+
+        snippet.title = 'Transparency'
+        snippet.save()
+        self.assertIn(b'Transparency', self.get_feed().content)
+
+        # the feed lists the snippets by tag name
+        self.tag.name = 'Television Data'
+        self.tag.save()
+        self.assertNotIn(b'Transparency', self.get_feed().content)
+
+    def test_not_modified(self):
+        self.create_snippet('Datasets')
+        response = self.get_feed()
+        self.assertEqual(response.status_code, 200)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        response = self.get_feed(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        response = self.get_feed(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        self.create_snippet('Transparency', days=1)
+        response = self.get_feed(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        response = self.get_feed(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
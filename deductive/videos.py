@@ -0,0 +1,313 @@
+"""
+Helpers shared by the coffee_video and video_post apps.
+
+Both video models have the same fields: a title, an embedded_link, a
+description, the comma separated `tag` editors fill in, its normalized
+`tags` (a many-to-many to the app's VideoTag) and a published_date.
+"""
+import base64
+import binascii
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag
+
+from cms.cache import invalidate_cms_page_cache
+from cms.models import Placeholder
+
+
+DEFAULT_PAGE_SIZE = 8
+MAX_PAGE_SIZE = 100
+
+# The tag the front end sends to list the videos of all tags.
+ALL_TAGS = 'All'
+
+# How many videos the detail endpoint returns at most at once.
+MAX_BATCH_SIZE = 20
+
+# How long browsers and CDNs may keep a video's details, and how long when
+# they were asked for by version.
+DETAIL_MAX_AGE = getattr(settings, 'VIDEO_DETAIL_MAX_AGE', 60 * 5)
+VERSIONED_DETAIL_MAX_AGE = 60 * 60 * 24 * 365
+
+# How long the details of a video are cached, they are fetched again anyway
+# when it is saved or deleted.
+VIDEO_CACHE_TIMEOUT = getattr(settings, 'VIDEO_CACHE_TIMEOUT', 60 * 60 * 24)
+
+# How long the tags of the videos are cached, they are built again anyway
+# when a video is saved or deleted.
+TAG_VOCABULARY_CACHE_TIMEOUT = getattr(
+    settings, 'VIDEO_TAGS_CACHE_TIMEOUT', 60 * 60 * 24)
+
+# The columns the video list plugins show.
+LISTED_FIELDS = ('id', 'title', 'embedded_link', 'published_date',
+                 'changed_date')
+
+
+def parse_tags(value):
+    """
+    Returns the distinct tag names of a comma separated string, stripped and
+    in the order they appear. Names are compared case-insensitively, as the
+    database compares them, keeping the first spelling.
+    """
+    names, seen = [], set()
+    for name in (value or '').split(','):
+        name = name.strip()
+        if name and name.lower() not in seen:
+            names.append(name)
+            seen.add(name.lower())
+    return names
+
+
+def get_tag_vocabulary_cache_key(model):
+    return 'deductive:video_tags:{0}'.format(model._meta.label_lower)
+
+
+def get_tag_vocabulary(model):
+    """
+    Returns the (name, number of videos) of the tags used by the videos of
+    the given model, ordered by name. It is cached until a video is saved or
+    deleted, or for TAG_VOCABULARY_CACHE_TIMEOUT seconds.
+    """
+    cache_key = get_tag_vocabulary_cache_key(model)
+    vocabulary = cache.get(cache_key)
+    if vocabulary is None:
+        tag_model = model.tags.field.related_model
+        vocabulary = list(tag_model.objects.annotate(
+            video_count=Count('videos'),
+        ).filter(video_count__gt=0).order_by('name').values_list(
+            'name', 'video_count'))
+        cache.set(cache_key, vocabulary, TAG_VOCABULARY_CACHE_TIMEOUT)
+    return vocabulary
+
+
+def invalidate_tag_vocabulary(model):
+    cache.delete(get_tag_vocabulary_cache_key(model))
+
+
+def sync_tags(video):
+    """
+    Points the video's tags to the names in its `tag` string, creating the
+    tags which do not exist yet. A name matches the existing tag spelled
+    with a different case, e.g. "tv" the tag "TV", since the unique index
+    on the tag names is case-insensitive.
+    """
+    tag_model = video.tags.model
+    tags = []
+    for name in parse_tags(video.tag):
+        # get_or_create() looks the tag up again when a concurrent save
+        # created it first
+        tag, created = tag_model.objects.get_or_create(
+            name__iexact=name, defaults={'name': name})
+        tags.append(tag)
+    video.tags.set(tags)
+    invalidate_tag_vocabulary(type(video))
+
+
+def get_latest_videos(model, count, fields=LISTED_FIELDS):
+    """
+    Returns the `count` latest videos of the given model, with only the
+    given fields loaded: a single query with a LIMIT.
+    """
+    return list(model.objects.only(*fields).order_by(
+        '-published_date', '-pk')[:count])
+
+
+def invalidate_plugin_caches(plugin_model):
+    """
+    Clears the cms cache of the placeholders holding a plugin of the given
+    model, and the cms page cache, so that they show the videos as they are
+    now. The news_snippet plugin uses it for its snippets as well.
+    """
+    plugins = plugin_model.objects.exclude(placeholder=None).values_list(
+        'placeholder_id', 'language').distinct()
+    languages = {}
+    for placeholder_id, language in plugins:
+        languages.setdefault(placeholder_id, set()).add(language)
+    for placeholder in Placeholder.objects.filter(pk__in=languages):
+        for language in languages[placeholder.pk]:
+            placeholder.clear_cache(language)
+    invalidate_cms_page_cache()
+
+
+def encode_cursor(video):
+    """Returns the token of the page following the given video."""
+    data = json.dumps([video['published_date'].isoformat(), video['id']])
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token):
+    """
+    Returns the (published_date, pk) of a token made by encode_cursor(), or
+    None if it is not a valid one.
+    """
+    try:
+        published_date, pk = json.loads(
+            base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+        published_date, pk = parse_datetime(published_date), int(pk)
+    except (TypeError, ValueError, binascii.Error):
+        return None
+    if published_date is None:
+        return None
+    return published_date, pk
+
+
+def get_page_size(request):
+    try:
+        count = int(request.GET.get('count', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        count = DEFAULT_PAGE_SIZE
+    return min(max(count, 1), MAX_PAGE_SIZE)
+
+
+def get_requested_tags(request):
+    """
+    Returns the tag names of the JSON list in the `tag` parameter, or an
+    empty list to list the videos of all tags.
+    """
+    try:
+        names = json.loads(request.GET.get('tag') or '[]')
+    except ValueError:
+        return []
+    if not isinstance(names, list) or ALL_TAGS in names:
+        return []
+    return parse_tags(','.join(str(name) for name in names))
+
+
+def get_version(video):
+    """
+    Returns the version of a video (or of a dict of its values): the time it
+    was last changed, as the template filter date:"YmdHisu" formats it.
+    """
+    changed_date = (video['changed_date'] if isinstance(video, dict)
+                    else video.changed_date)
+    return changed_date.strftime('%Y%m%d%H%M%S%f')
+
+
+def get_video_cache_key(model, pk):
+    return 'deductive:video:{0}:{1}'.format(model._meta.label_lower, pk)
+
+
+def invalidate_video(model, pk):
+    cache.delete(get_video_cache_key(model, pk))
+
+
+def get_video_details(model, ids):
+    """
+    Returns a {pk: details} dict of those of the given videos that exist.
+    The details are cached per video until it is saved or deleted, or for
+    VIDEO_CACHE_TIMEOUT seconds.
+    """
+    cache_keys = dict((get_video_cache_key(model, pk), pk) for pk in ids)
+    details = dict(
+        (cache_keys[key], value)
+        for key, value in cache.get_many(list(cache_keys)).items())
+    missing = [pk for pk in ids if pk not in details]
+    if missing:
+        fetched = dict(
+            (video['id'], {
+                'id': video['id'],
+                'title': video['title'],
+                'link': video['embedded_link'],
+                'description': video['description'],
+                'version': get_version(video),
+            })
+            for video in model.objects.filter(pk__in=missing).values(
+                'id', 'title', 'embedded_link', 'description',
+                'changed_date'))
+        cache.set_many(dict(
+            (get_video_cache_key(model, pk), value)
+            for pk, value in fetched.items()), VIDEO_CACHE_TIMEOUT)
+        details.update(fetched)
+    return details
+
+
+def parse_ids(value):
+    """Returns the distinct integers of a comma separated string."""
+    ids = []
+    for bit in (value or '').split(','):
+        try:
+            pk = int(bit)
+        except ValueError:
+            continue
+        if pk not in ids:
+            ids.append(pk)
+    return ids
+
+
+def video_detail(request, model):
+    """
+    Returns the details of the video of the `id` parameter, or, given comma
+    separated `ids`, {"videos": [...]} with those of the videos which exist.
+
+    Responses carry an ETag built from the versions of the videos, so that
+    conditional requests get a 304. Browsers and CDNs may keep them for
+    DETAIL_MAX_AGE seconds, or for a year when the versions the client
+    expects are passed as `v` (comma separated as well): such a url changes
+    whenever one of the videos does.
+    """
+    batch = 'ids' in request.GET
+    ids = parse_ids(request.GET.get('ids' if batch else 'id'))[:MAX_BATCH_SIZE]
+    details = get_video_details(model, ids)
+    videos = [details[pk] for pk in ids if pk in details]
+    if not batch and not videos:
+        return JsonResponse({'error': 'Video not found.'}, status=404)
+
+    versions = [video['version'] for video in videos]
+    response = JsonResponse({'videos': videos} if batch else videos[0])
+    etag = quote_etag(hashlib.md5(','.join(
+        '{0}:{1}'.format(video['id'], video['version'])
+        for video in videos).encode('utf-8')).hexdigest())
+    response['ETag'] = etag
+    if videos and request.GET.get('v', '').split(',') == versions:
+        patch_cache_control(
+            response, public=True, max_age=VERSIONED_DETAIL_MAX_AGE,
+            immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=DETAIL_MAX_AGE)
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+def filter_videos(request, model):
+    """
+    Returns a JSON page of the latest videos having any of the requested
+    tags, and the cursor of the next page (or null) to pass back as the
+    `cursor` parameter. Each page is a single indexed query, however many
+    videos there are.
+    """
+    count = get_page_size(request)
+    queryset = model.objects.order_by('-published_date', '-pk')
+    tags = get_requested_tags(request)
+    if tags:
+        # a subquery on the through table, so that no DISTINCT is needed
+        field = model.tags.field
+        tagged = model.tags.through.objects.filter(**{
+            '{0}__name__in'.format(field.m2m_reverse_field_name()): tags,
+        }).values(field.m2m_field_name())
+        queryset = queryset.filter(pk__in=tagged)
+    cursor = decode_cursor(request.GET.get('cursor', ''))
+    if cursor is not None:
+        published_date, pk = cursor
+        queryset = queryset.filter(
+            Q(published_date__lt=published_date) |
+            Q(published_date=published_date, pk__lt=pk))
+    # one more, to know whether there is a next page
+    videos = list(queryset.values(
+        'id', 'title', 'embedded_link', 'published_date',
+        'changed_date')[:count + 1])
+    next_cursor = None
+    if len(videos) > count:
+        next_cursor = encode_cursor(videos[count - 1])
+    return JsonResponse({
+        'videos': [
+            {'id': video['id'], 'title': video['title'],
+             'link': video['embedded_link'], 'version': get_version(video)}
+            for video in videos[:count]],
+        'next_cursor': next_cursor,
+    })
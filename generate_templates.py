@@ -18,6 +18,7 @@ from troposphere.ec2 import VPC, SecurityGroup, Subnet, Tags, \
     SecurityGroupRule, VPCEndpoint
 from troposphere.rds import DBCluster, ScalingConfiguration, \
     DBSubnetGroup
+from troposphere.elasticache import CacheCluster, SubnetGroup
 from troposphere.cloudfront import Distribution, DistributionConfig
 from troposphere.cloudfront import Origin, DefaultCacheBehavior, ViewerCertificate
 from troposphere.cloudfront import ForwardedValues
@@ -683,6 +684,25 @@ class DeploymentTemplates:
             DependsOn=['DBSubnetGroup']
         ))
 
+        """
+        Deploy the memcached cluster shared by the Lambda containers
+        """
+        t.add_resource(SubnetGroup(
+            "CacheSubnetGroup",
+            Description="Subnets available for the cache cluster",
+            SubnetIds=[Ref("PrivateSubnet1"), Ref("PrivateSubnet2")],
+            DependsOn = ['PrivateSubnet1', 'PrivateSubnet2']
+        ))
+        t.add_resource(CacheCluster(
+            "CacheCluster",
+            Engine='memcached',
+            CacheNodeType='cache.t3.micro',
+            NumCacheNodes=1,
+            CacheSubnetGroupName=Ref("CacheSubnetGroup"),
+            VpcSecurityGroupIds=[GetAtt("SecurityGroup", "GroupId")],
+            DependsOn=['CacheSubnetGroup']
+        ))
+
         """
         Deploy backup server template
         """
@@ -822,6 +842,14 @@ class DeploymentTemplates:
                 Description="Endpoint port for database",
                 Value=GetAtt('AuroraCluster', 'Endpoint.Port')
             ),
+            Output(
+                "CacheLocation",
+                Description="Endpoint of the cache cluster, as host:port",
+                Value=Join(':', [
+                    GetAtt('CacheCluster', 'ConfigurationEndpoint.Address'),
+                    GetAtt('CacheCluster', 'ConfigurationEndpoint.Port')
+                ])
+            ),
             Output(
                 "SubnetIds",
                 Description="VPC info for database",
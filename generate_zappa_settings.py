@@ -38,7 +38,7 @@ if __name__ == "__main__":
     """
     Check arguments
     """
-    if len(sys.argv) != 20:
+    if len(sys.argv) != 21:
 
         logger.info("Cannot create Zappa settings file. Incorrect arguments: " +
                     str(sys.argv))
@@ -67,6 +67,7 @@ if __name__ == "__main__":
         staticsub = str(sys.argv[17])
         sslcert = str(sys.argv[18])
         secretkey = str(sys.argv[19])
+        cachelocation = str(sys.argv[20])  # e.g. 'host:11211'
 
         bucket = "{}-{}".format(project, aws_stage.lower())
         domain_url = "{}.{}".format(subdomain, domain)
@@ -99,7 +100,8 @@ if __name__ == "__main__":
                 'CUSTOM_DOMAIN': domain_url,
                 'STATIC_CUSTOM_DOMAIN': static_url,
                 'SECRET_KEY': secretkey,
-                'AWS_STAGE': aws_stage
+                'AWS_STAGE': aws_stage,
+                'CACHE_LOCATION': cachelocation
             },
             'vpc_config': {
                 'SubnetIds': subnetids.split(','),
@@ -126,6 +128,10 @@ if __name__ == "__main__":
             'cache_cluster_size': 1.6,
             'keep_warm_expression': 'rate(4 minutes)',
             'keep_warm': True,
+            'events': [{
+                'function': 'deductive.events.update_outdated_search_data',
+                'expression': 'rate(1 minute)'
+            }],
         }
 
         zappa_settings[zappa_stage] = stage_settings
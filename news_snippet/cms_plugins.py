@@ -9,7 +9,6 @@ class NewsSnippetPligin(CMSPluginBase):
     model = NewsBlogLatestArticlesPlugin
     name = _("Latest News Snippets")
     render_template = "news_snippet.html"
-    cache = False
 
     def render(self, context, instance, placeholder):
         request = context.get('request')
@@ -1,4 +1,9 @@
+import uuid
+
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from djangocms_text_ckeditor.fields import HTMLField
 from django.utils.translation import ugettext_lazy as _
 from datetime import datetime
@@ -7,6 +12,13 @@ from django.utils.translation import ugettext
 from cms.models.pluginmodel import CMSPlugin
 from taggit.models import Tag
 
+from deductive.videos import invalidate_plugin_caches
+
+
+SNIPPETS_VERSION_CACHE_KEY = 'news_snippet:version'
+# An expired version is simply replaced, making the snippets render again.
+SNIPPETS_VERSION_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
 
 class NewsSnippet(CMSPlugin):
     title = models.CharField(max_length=255)
@@ -25,6 +37,9 @@ class NewsSnippet(CMSPlugin):
     )
     link = models.CharField(max_length=255)
 
+    class Meta:
+        index_together = [('tag', 'published_date')]
+
     def __str__(self):
         return self.title
 
@@ -41,12 +56,49 @@ class NewsBlogLatestArticlesPlugin(CMSPlugin):
         on_delete=models.CASCADE,
     )
     def get_snippets(self, request):
-        queryset = NewsSnippet.objects.all()
+        """
+        Returns the latest snippets of the plugin's tag. The queryset is
+        lazy, so that it is not run when the placeholder is cached.
+        """
+        queryset = NewsSnippet.objects.filter(tag_id=self.news_tag_id)
         queryset = queryset.order_by('-published_date')
-        result = [x for x in queryset if self.news_tag.name == x.tag.name ]
-        return result[:self.latest_snippets]
+        return queryset[:self.latest_snippets]
 
     def __str__(self):
         return ugettext('latest snippets: %(latest_snippets)s') % {
             'latest_snippets': self.latest_snippets,
-        }
\ No newline at end of file
+        }
+
+
+def get_snippets_version():
+    """
+    Returns a token that changes whenever a news snippet or a tag is saved or
+    deleted.
+    Include it in the cache keys of anything rendered from snippets.
+    """
+    version = cache.get(SNIPPETS_VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(SNIPPETS_VERSION_CACHE_KEY, uuid.uuid4().hex,
+                  SNIPPETS_VERSION_CACHE_TIMEOUT)
+        version = cache.get(SNIPPETS_VERSION_CACHE_KEY)
+    return version
+
+
+@receiver(post_save, sender=NewsSnippet, dispatch_uid='news_snippet_version_save')
+@receiver(post_delete, sender=NewsSnippet, dispatch_uid='news_snippet_version_delete')
+@receiver(post_save, sender=Tag, dispatch_uid='news_snippet_version_tag_save')
+@receiver(post_delete, sender=Tag, dispatch_uid='news_snippet_version_tag_delete')
+def update_snippets_version(sender, instance, **kwargs):
+    # snippets are filtered and listed by tag name, so renaming a tag
+    # changes them as well
+    cache.set(SNIPPETS_VERSION_CACHE_KEY, uuid.uuid4().hex,
+              SNIPPETS_VERSION_CACHE_TIMEOUT)
+
+
+@receiver(post_save, sender=NewsSnippet, dispatch_uid='news_snippet_plugin_cache_save')
+@receiver(post_delete, sender=NewsSnippet, dispatch_uid='news_snippet_plugin_cache_delete')
+@receiver(post_save, sender=Tag, dispatch_uid='news_snippet_plugin_cache_tag_save')
+@receiver(post_delete, sender=Tag, dispatch_uid='news_snippet_plugin_cache_tag_delete')
+def update_plugin_caches(sender, instance, **kwargs):
+    # the plugins are cached by the cms along with their placeholders
+    invalidate_plugin_caches(NewsBlogLatestArticlesPlugin)
@@ -1,3 +1,102 @@
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from taggit.models import Tag
+
+from cms import api
+
+from news_snippet.cms_plugins import NewsSnippetPligin
+from news_snippet.models import (
+    NewsBlogLatestArticlesPlugin, NewsSnippet, get_snippets_version,
+)
+
+
+class SnippetsVersionTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_tag_rename_changes_version(self):
+        tag = Tag.objects.create(name='TV Data', slug='tv-data')
+        version = get_snippets_version()
+        self.assertEqual(get_snippets_version(), version)
+
+        tag.name = 'Television Data'
+        tag.save()
+        self.assertNotEqual(get_snippets_version(), version)
+
+    def test_tag_delete_changes_version(self):
+        tag = Tag.objects.create(name='TV Data', slug='tv-data')
+        version = get_snippets_version()
+        tag.delete()
+        self.assertNotEqual(get_snippets_version(), version)
+
+
+class LatestSnippetsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.tag = Tag.objects.create(name='TV Data', slug='tv-data')
+        self.other_tag = Tag.objects.create(name='Privacy', slug='privacy')
+
+    def create_snippet(self, title, tag, published_date):
+        return NewsSnippet.objects.create(
+            title=title, link='https://www.beet.tv/', tag=tag,
+            published_date=published_date)
+
+    def test_get_snippets(self):
+        snippets = [
+            self.create_snippet('Snippet {0}'.format(day), self.tag,
+                                datetime(2020, 6, day, 9, 37, 40))
+            for day in range(1, 5)]
+        self.create_snippet('Privacy', self.other_tag, datetime(2020, 7, 1))
+        self.create_snippet('Untagged', None, datetime(2020, 7, 1))
+        plugin = NewsBlogLatestArticlesPlugin.objects.create(
+            latest_snippets=2, news_tag=self.tag)
+        queryset = plugin.get_snippets(None)
+        # a single query, limited to the snippets shown
+        self.assertEqual(queryset.query.high_mark, 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(list(queryset), [snippets[3], snippets[2]])
+
+    def test_get_snippets_of_another_tag(self):
+        self.create_snippet('TV', self.tag, datetime(2020, 6, 15))
+        snippet = self.create_snippet(
+            'Privacy', self.other_tag, datetime(2020, 6, 15))
+        plugin = NewsBlogLatestArticlesPlugin.objects.create(
+            latest_snippets=5, news_tag=self.other_tag)
+        self.assertEqual(list(plugin.get_snippets(None)), [snippet])
+
+    def test_rendered_snippets_cached(self):
+        snippet = self.create_snippet(
+            'Datasets', self.tag, datetime(2020, 6, 15))
+        page = api.create_page('News', 'fullwidth.html', 'en',
+                               published=True)
+        api.add_plugin(page.placeholders.get(slot='content'),
+                       NewsSnippetPligin, 'en', news_tag=self.tag)
+        page.publish('en')
+        url = page.get_absolute_url('en')
+        self.assertContains(self.client.get(url), 'Datasets')
+
+        # the cached placeholder is shown without querying the snippets
+        with CaptureQueriesContext(connection) as queries:
+            self.assertContains(self.client.get(url), 'Datasets')
+        table = NewsSnippet._meta.db_table
+        self.assertFalse([query for query in queries
+                          if table in query['sql']])
+
+        # changes made without the signals do not show
+        NewsSnippet.objects.filter(pk=snippet.pk).update(title='Panel')
+        self.assertContains(self.client.get(url), 'Datasets')
+
+        snippet.title = 'Transparency'
+        snippet.save()
+        response = self.client.get(url)
+        self.assertContains(response, 'Transparency')
+        self.assertNotContains(response, 'Datasets')
 
-# Create your tests here.
+        snippet.delete()
+        self.assertNotContains(self.client.get(url), 'Transparency')
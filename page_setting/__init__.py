@@ -0,0 +1 @@
+default_app_config = 'page_setting.apps.PageSettingConfig'
@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class PageSettingConfig(AppConfig):
     name = 'page_setting'
+
+    def ready(self):
+        from .utils import invalidate_page_tag_cache
+
+        Page_Tag = self.get_model('Page_Tag')
+        post_save.connect(invalidate_page_tag_cache, sender=Page_Tag,
+                          dispatch_uid='page_tag_cache_save')
+        post_delete.connect(invalidate_page_tag_cache, sender=Page_Tag,
+                            dispatch_uid='page_tag_cache_delete')
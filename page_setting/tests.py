@@ -1,3 +1,48 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
 
-# Create your tests here.
+from cms import api
+
+from page_setting.models import Page_Tag
+from page_setting.utils import get_page_tag
+
+
+class PageTagTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.page = api.create_page('Home', 'fullwidth.html', 'en')
+
+    def get_request(self):
+        request = RequestFactory().get('/')
+        request.current_page = self.page
+        return request
+
+    def test_get_page_tag(self):
+        Page_Tag.objects.create(page=self.page, page_tag='TV Data')
+        request = self.get_request()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_page_tag(request), 'TV Data')
+            # memoized on the request
+            self.assertEqual(get_page_tag(request), 'TV Data')
+        # and cached for the next requests
+        with self.assertNumQueries(0):
+            self.assertEqual(get_page_tag(self.get_request()), 'TV Data')
+
+    def test_page_without_tag(self):
+        self.assertIsNone(get_page_tag(self.get_request()))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_page_tag(self.get_request()))
+        request = self.get_request()
+        request.current_page = None
+        self.assertIsNone(get_page_tag(request))
+
+    def test_invalidated_on_save_and_delete(self):
+        self.assertIsNone(get_page_tag(self.get_request()))
+        page_tag = Page_Tag.objects.create(page=self.page, page_tag='TV Data')
+        self.assertEqual(get_page_tag(self.get_request()), 'TV Data')
+        page_tag.page_tag = 'Connected Car'
+        page_tag.save()
+        self.assertEqual(get_page_tag(self.get_request()), 'Connected Car')
+        page_tag.delete()
+        self.assertIsNone(get_page_tag(self.get_request()))
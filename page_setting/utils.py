@@ -0,0 +1,80 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from page_setting.models import Page_Tag
+
+
+# How long the page tags are cached (in seconds), they are looked up again
+# anyway when a Page_Tag is saved or deleted.
+PAGE_TAG_CACHE_TIMEOUT = getattr(settings, 'PAGE_TAG_CACHE_TIMEOUT', 300)
+
+PAGE_TAGS_VERSION_CACHE_KEY = 'page_setting:page_tags:version'
+# An expired version is simply replaced, making the tags looked up again.
+PAGE_TAGS_VERSION_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def get_page_tags_version():
+    """
+    Returns a token that changes whenever a Page_Tag is saved or deleted.
+    It is part of the cache keys of the page tags, so that changing it
+    invalidates all of them, in every process sharing the cache.
+    """
+    version = cache.get(PAGE_TAGS_VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(PAGE_TAGS_VERSION_CACHE_KEY, uuid.uuid4().hex,
+                  PAGE_TAGS_VERSION_CACHE_TIMEOUT)
+        version = cache.get(PAGE_TAGS_VERSION_CACHE_KEY)
+    return version
+
+
+def get_page_tag_cache_key(node_id):
+    return 'page_setting:page_tag:{0}:{1}'.format(
+        get_page_tags_version(), node_id)
+
+
+def get_page_tag_for_node(node_id):
+    """
+    Returns the page_tag of the (draft) page of the given tree node, or None
+    if that page has no tag.
+    """
+    cache_key = get_page_tag_cache_key(node_id)
+    page_tag = cache.get(cache_key)
+    if page_tag is None:
+        page_tag = (Page_Tag.objects
+                    .filter(page__node_id=node_id,
+                            page__publisher_is_draft=True)
+                    .values_list('page_tag', flat=True)
+                    .first())
+        # memcached does not store None, pages without a tag are cached as ''
+        page_tag = page_tag or ''
+        cache.set(cache_key, page_tag, PAGE_TAG_CACHE_TIMEOUT)
+    return page_tag or None
+
+
+def get_page_tag(request):
+    """
+    Returns the page_tag of the request's current CMS page, or None. The
+    result is memoized on the request, so the context processor and all the
+    plugins of a page share a single lookup.
+    """
+    try:
+        return request._page_tag
+    except AttributeError:
+        pass
+    node_id = getattr(getattr(request, 'current_page', None), 'node_id', None)
+    page_tag = get_page_tag_for_node(node_id) if node_id else None
+    request._page_tag = page_tag
+    return page_tag
+
+
+def clear_page_tag_cache():
+    """Drops all the cached page tags, in every process sharing the cache."""
+    cache.set(PAGE_TAGS_VERSION_CACHE_KEY, uuid.uuid4().hex,
+              PAGE_TAGS_VERSION_CACHE_TIMEOUT)
+
+
+def invalidate_page_tag_cache(sender, **kwargs):
+    """Signal receiver dropping all the cached page tags."""
+    clear_page_tag_cache()
@@ -156,7 +156,7 @@ deploy_django () {
         $DBNAME $DBUSER $DBPWORD $DBHOST $DBPORT \
         $SUBNETIDS $SECURITYGROUPID \
         $SU_PASS $DOMAIN $SUBDOMAIN $STATICSUB \
-        $SSLCERT $SECRETKEY
+        $SSLCERT $SECRETKEY $CACHELOCATION
 
     # Is this stack already deployed?
     STATUS=$(zappa status $ZAPPA_STAGE 2>/dev/null)
@@ -274,6 +274,7 @@ get_stack_output () {
     SUBNETIDS=$(aws cloudformation describe-stacks --stack-name $STACK_NAME --output text --query 'Stacks[*].Outputs[?OutputKey==`SubnetIds`].[OutputValue]' $PROFILE_OPT $REGION_OPT)
     SECURITYGROUPID=$(aws cloudformation describe-stacks --stack-name $STACK_NAME --output text --query 'Stacks[*].Outputs[?OutputKey==`SecurityGroupId`].[OutputValue]' $PROFILE_OPT $REGION_OPT)
     DISTRIBID=$(aws cloudformation describe-stacks --stack-name $STACK_NAME --output text --query 'Stacks[*].Outputs[?OutputKey==`CloudFrontDistrib`].[OutputValue]' $PROFILE_OPT $REGION_OPT)
+    CACHELOCATION=$(aws cloudformation describe-stacks --stack-name $STACK_NAME --output text --query 'Stacks[*].Outputs[?OutputKey==`CacheLocation`].[OutputValue]' $PROFILE_OPT $REGION_OPT)
 }
 
 delete_stack () {
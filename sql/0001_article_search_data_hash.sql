@@ -0,0 +1,6 @@
+-- The fingerprint of the content an article translation's search_data was
+-- built from, compared by rebuild_article_search_data --incremental.
+-- Run `manage.py rebuild_article_search_data` once afterwards to fill it.
+
+ALTER TABLE `aldryn_newsblog_article_translation`
+  ADD COLUMN `search_data_hash` varchar(40) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT '' AFTER `search_data`;
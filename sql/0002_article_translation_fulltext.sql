@@ -0,0 +1,6 @@
+-- The full-text index the MySQL article search backend ranks results with
+-- (aldryn_newsblog.utils.search.MySQLFulltextSearchBackend). Without it the
+-- search falls back to the icontains backend.
+
+CREATE FULLTEXT INDEX `aldryn_newsblog_article_translation_fulltext`
+  ON `aldryn_newsblog_article_translation` (`title`, `lead_in`, `search_data`);
@@ -0,0 +1,21 @@
+-- The materialized article counts of the authors, categories and tags
+-- plugins (aldryn_newsblog.models.ArticleCount).
+-- Run `manage.py rebuild_article_counts` once afterwards to fill it, and
+-- preferably on a schedule (e.g. hourly), so that the counts outdated by
+-- scheduled articles going live are refreshed outside of the requests.
+
+CREATE TABLE `aldryn_newsblog_articlecount`  (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `object_id` int(10) UNSIGNED NOT NULL,
+  `published_count` int(10) UNSIGNED NOT NULL,
+  `total_count` int(10) UNSIGNED NOT NULL,
+  `refreshed` datetime(6) NOT NULL,
+  `valid_until` datetime(6) NULL DEFAULT NULL,
+  `app_config_id` int(11) NOT NULL,
+  `content_type_id` int(11) NOT NULL,
+  PRIMARY KEY (`id`) USING BTREE,
+  UNIQUE INDEX `aldryn_newsblog_articlecount_app_config_id_uniq`(`app_config_id`, `content_type_id`, `object_id`) USING BTREE,
+  INDEX `aldryn_newsblog_articlecount_content_type_id`(`content_type_id`) USING BTREE,
+  CONSTRAINT `aldryn_newsblog_articlecount_app_config_id_fk` FOREIGN KEY (`app_config_id`) REFERENCES `aldryn_newsblog_newsblogconfig` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
+  CONSTRAINT `aldryn_newsblog_articlecount_content_type_id_fk` FOREIGN KEY (`content_type_id`) REFERENCES `django_content_type` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE = InnoDB CHARACTER SET = utf8 COLLATE = utf8_unicode_ci ROW_FORMAT = Compact;
@@ -0,0 +1,5 @@
+-- The pagination mode of the article lists of an app config
+-- (NewsBlogConfig.pagination_mode), 'offset' or 'keyset'.
+
+ALTER TABLE `aldryn_newsblog_newsblogconfig`
+  ADD COLUMN `pagination_mode` varchar(10) CHARACTER SET utf8 COLLATE utf8_unicode_ci NOT NULL DEFAULT 'offset' AFTER `pagination_pages_visible`;
@@ -0,0 +1,7 @@
+-- The AMP markup of an article translation's lead-in, stored on save
+-- (Article.amp_lead_in). NULL marks the translations saved before, whose
+-- markup is converted on every AMP request until they are saved again.
+-- Run `manage.py rebuild_article_amp` once afterwards to fill it.
+
+ALTER TABLE `aldryn_newsblog_article_translation`
+  ADD COLUMN `amp_lead_in` longtext CHARACTER SET utf8 COLLATE utf8_unicode_ci NULL DEFAULT NULL AFTER `lead_in`;
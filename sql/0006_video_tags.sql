@@ -0,0 +1,48 @@
+-- The normalized tags of the coffee videos and video posts
+-- (coffee_video.models.VideoTag, video_post.models.VideoTag and the `tags`
+-- of CoffeeVideo and VideoPost), and the published_date indexes their
+-- lists are ordered by.
+-- Run `manage.py sync_video_tags` once afterwards: it builds the tags of the
+-- existing videos from their comma separated `tag` column.
+
+CREATE TABLE `coffee_video_videotag`  (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `name` varchar(255) CHARACTER SET latin1 COLLATE latin1_swedish_ci NOT NULL,
+  PRIMARY KEY (`id`) USING BTREE,
+  UNIQUE INDEX `name`(`name`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = latin1 COLLATE = latin1_swedish_ci ROW_FORMAT = Compact;
+
+CREATE TABLE `coffee_video_coffeevideo_tags`  (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `coffeevideo_id` int(11) NOT NULL,
+  `videotag_id` int(11) NOT NULL,
+  PRIMARY KEY (`id`) USING BTREE,
+  UNIQUE INDEX `coffee_video_coffeevideo_tags_coffeevideo_id_videotag_id_uniq`(`coffeevideo_id`, `videotag_id`) USING BTREE,
+  INDEX `coffee_video_coffeevideo_tags_videotag_id`(`videotag_id`) USING BTREE,
+  CONSTRAINT `coffee_video_coffeevideo_tags_coffeevideo_id_fk` FOREIGN KEY (`coffeevideo_id`) REFERENCES `coffee_video_coffeevideo` (`cmsplugin_ptr_id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
+  CONSTRAINT `coffee_video_coffeevideo_tags_videotag_id_fk` FOREIGN KEY (`videotag_id`) REFERENCES `coffee_video_videotag` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE = InnoDB CHARACTER SET = latin1 COLLATE = latin1_swedish_ci ROW_FORMAT = Compact;
+
+ALTER TABLE `coffee_video_coffeevideo`
+  ADD INDEX `coffee_video_coffeevideo_published_date`(`published_date`) USING BTREE;
+
+CREATE TABLE `video_post_videotag`  (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `name` varchar(255) CHARACTER SET latin1 COLLATE latin1_swedish_ci NOT NULL,
+  PRIMARY KEY (`id`) USING BTREE,
+  UNIQUE INDEX `name`(`name`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = latin1 COLLATE = latin1_swedish_ci ROW_FORMAT = Compact;
+
+CREATE TABLE `video_post_videopost_tags`  (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `videopost_id` int(11) NOT NULL,
+  `videotag_id` int(11) NOT NULL,
+  PRIMARY KEY (`id`) USING BTREE,
+  UNIQUE INDEX `video_post_videopost_tags_videopost_id_videotag_id_uniq`(`videopost_id`, `videotag_id`) USING BTREE,
+  INDEX `video_post_videopost_tags_videotag_id`(`videotag_id`) USING BTREE,
+  CONSTRAINT `video_post_videopost_tags_videopost_id_fk` FOREIGN KEY (`videopost_id`) REFERENCES `video_post_videopost` (`cmsplugin_ptr_id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
+  CONSTRAINT `video_post_videopost_tags_videotag_id_fk` FOREIGN KEY (`videotag_id`) REFERENCES `video_post_videotag` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE = InnoDB CHARACTER SET = latin1 COLLATE = latin1_swedish_ci ROW_FORMAT = Compact;
+
+ALTER TABLE `video_post_videopost`
+  ADD INDEX `video_post_videopost_published_date`(`published_date`) USING BTREE;
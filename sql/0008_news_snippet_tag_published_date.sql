@@ -0,0 +1,6 @@
+-- The index the latest snippets plugin lists the snippets of a tag by
+-- (NewsSnippet.Meta.index_together): WHERE tag_id = ... ORDER BY
+-- published_date DESC LIMIT n reads only the rows it returns.
+
+ALTER TABLE `news_snippet_newssnippet`
+  ADD INDEX `news_snippet_newssnippet_tag_id_published_date_idx`(`tag_id`, `published_date`) USING BTREE;
@@ -0,0 +1,8 @@
+-- The index rebuild_article_search_data --outdated finds the translations
+-- whose content plugins were saved by: their search_data_hash is emptied
+-- (aldryn_newsblog.utils.search_data).
+-- Schedule `manage.py rebuild_article_search_data --outdated` afterwards,
+-- e.g. through the Zappa event of deductive.events, every minute.
+
+ALTER TABLE `aldryn_newsblog_article_translation`
+  ADD INDEX `aldryn_newsblog_article_translation_search_data_hash`(`search_data_hash`) USING BTREE;
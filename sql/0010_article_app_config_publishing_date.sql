@@ -0,0 +1,7 @@
+-- The index the article lists, their keyset pagination (KeysetPaginator)
+-- and the previous/next article lookups seek by: WHERE app_config_id = ...
+-- ORDER BY publishing_date DESC, id DESC LIMIT n reads only the rows it
+-- returns, instead of sorting every article of the app config.
+
+ALTER TABLE `aldryn_newsblog_article`
+  ADD INDEX `aldryn_newsblog_article_app_config_id_publishing_date_id`(`app_config_id`, `publishing_date`, `id`) USING BTREE;
@@ -1,3 +1,32 @@
+import json
+from datetime import datetime
+
 from django.test import TestCase
 
-# Create your tests here.
+from .models import VideoPost
+
+
+class UrlsTest(TestCase):
+    """The endpoints themselves are tested in deductive.tests."""
+
+    def setUp(self):
+        self.video = VideoPost.objects.create(
+            title='Using NRP', tag='NRP',
+            embedded_link='https://www.youtube.com/embed/cQO6GHOW7go',
+            published_date=datetime(2020, 7, 16, 11, 14, 35))
+
+    def get_json(self, path, params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content.decode('utf-8'))
+
+    def test_filter_by_tag(self):
+        data = self.get_json('/video-post/filter-by-tag',
+                             {'tag': json.dumps(['NRP'])})
+        self.assertEqual([video['id'] for video in data['videos']],
+                         [self.video.pk])
+
+    def test_get_content_by_id(self):
+        data = self.get_json('/video-post/get-content-by-id',
+                             {'id': self.video.pk})
+        self.assertEqual(data['title'], 'Using NRP')